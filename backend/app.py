@@ -1,20 +1,22 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, has_request_context, jsonify, request
 from pathlib import Path
 import pandas as pd
-import numpy as np
 import os
+import re
+import time
 from flask_cors import CORS
 
-from sklearn.linear_model import LinearRegression
-
-# prophet is optional
-try:
-    from prophet import Prophet
-except Exception:
-    try:
-        from fbprophet import Prophet
-    except Exception:
-        Prophet = None
+import metrics
+from cache import DiskCache, LRUCache
+from forecast_artifact import ForecastArtifact
+from jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue
+from forecasting import INLINE_MODELS, MAX_HORIZON, forecast_linear_many, forecast_series, series_fingerprint
+from kpi_engine import compute_kpis
+from kpi_store import KPI_FILES, KpiStore
+from prophet_backend import fit_stats
+from series_index import SeriesIndex
+from singleflight import SingleFlight
+from title_search import TitleSearchIndex
 
 app = Flask(__name__)
 CORS(app)
@@ -22,9 +24,167 @@ CORS(app)
 DATA_PATH = Path("data/processed/monthly_aggregates.parquet")
 WINNERS_PATH = Path("data/processed/plots/model_winners.json")
 KPI_DIR = Path("data/processed/kpis")
+FORECAST_CACHE_DIR = Path("data/processed/forecast_cache")
+FORECASTS_PATH = Path("data/processed/forecasts.parquet")
+FORECAST_JOB_DIR = Path("data/processed/forecast_jobs")
+
+# forecast cache settings (env overrides for deployment)
+FORECAST_CACHE_SIZE = int(os.environ.get("FORECAST_CACHE_SIZE", 1024))
+FORECAST_CACHE_TTL = float(os.environ.get("FORECAST_CACHE_TTL", 24 * 3600))
+FORECAST_DISK_CACHE = os.environ.get("FORECAST_DISK_CACHE", "1") == "1"
+
+# batch forecast limit
+FORECAST_BATCH_MAX_TITLES = int(os.environ.get("FORECAST_BATCH_MAX_TITLES", 200))
+
+# longest horizon (months) a request may ask for: the horizon the offline artifact is built
+# at, so every allowed request for a precomputed title is served from it
+FORECAST_MAX_HORIZON = MAX_HORIZON
+
+# background Prophet fits: worker threads, max queued/running jobs, how long finished jobs are kept
+FORECAST_JOB_WORKERS = int(os.environ.get("FORECAST_JOB_WORKERS", 2))
+FORECAST_JOB_MAX_PENDING = int(os.environ.get("FORECAST_JOB_MAX_PENDING", 64))
+FORECAST_JOB_KEEP = float(os.environ.get("FORECAST_JOB_KEEP", 600))
+# job state shared through FORECAST_JOB_DIR, so any serve.py worker can answer a status poll
+FORECAST_JOB_SHARED = os.environ.get("FORECAST_JOB_SHARED", "1") == "1"
+
+# on-demand KPI query limits
+KPI_QUERY_MAX_N = 500
+# accepted start / end values: YYYY-MM or YYYY-MM-DD
+KPI_QUERY_MONTH_RE = re.compile(r"^\d{4}-\d{2}(-\d{2})?$")
+KPI_QUERY_CACHE_SIZE = int(os.environ.get("KPI_QUERY_CACHE_SIZE", 256))
+
+# title search paging
+TITLE_SEARCH_PAGE_SIZE = 20
+TITLE_SEARCH_MAX_PAGE_SIZE = 100
+
+# title -> monthly series index + integer-coded columnar store, rebuilt automatically when the parquet changes
+series_index = SeriesIndex(DATA_PATH)
+series_index.refresh()
+
+
+def load_winners(path=WINNERS_PATH):
+    # title.lower() -> best_model (first row wins, same as the old filter + iloc[0])
+    winners_df = pd.read_json(path)
+    winners = {}
+    for t, m in zip(winners_df["job_title"], winners_df["best_model"]):
+        winners.setdefault(str(t).lower(), m)
+    return winners
+
+
+winners_by_title = load_winners()
+
+# KPI tables kept in memory as ready-to-send JSON, reloaded when the CSVs change
+kpi_store = KpiStore(KPI_DIR, dumps=app.json.dumps)
+kpi_store.refresh()
+
+# results of /api/kpis/query, keyed on data version + parameters
+kpi_query_cache = LRUCache(max_size=KPI_QUERY_CACHE_SIZE)
+
+# offline forecasts from models/precompute_forecasts.py (optional)
+forecast_artifact = ForecastArtifact(FORECASTS_PATH)
+forecast_artifact.refresh()
+
+# live-fitted forecasts, memory first then disk
+forecast_cache = LRUCache(max_size=FORECAST_CACHE_SIZE, ttl=FORECAST_CACHE_TTL)
+forecast_disk = DiskCache(FORECAST_CACHE_DIR, ttl=FORECAST_CACHE_TTL) if FORECAST_DISK_CACHE else None
+if forecast_disk is not None:
+    forecast_disk.prune()
+
+# slow (Prophet) fits run here so they never hold a request thread
+forecast_jobs = JobQueue(
+    max_workers=FORECAST_JOB_WORKERS,
+    max_pending=FORECAST_JOB_MAX_PENDING,
+    keep_seconds=FORECAST_JOB_KEEP,
+    shared_dir=FORECAST_JOB_DIR if FORECAST_JOB_SHARED else None,
+)
+
+
+# identical concurrent history / forecast / KPI-query requests share one computation
+flight = SingleFlight()
+
+# latency histograms + counters, scraped from /metrics (p95/p99 via histogram_quantile)
+REQUEST_SECONDS = metrics.registry.histogram(
+    "http_request_duration_seconds", "Request latency by route, method and status"
+)
+PHASE_SECONDS = metrics.registry.histogram(
+    "app_phase_duration_seconds", "Time spent in one step of a request (lookup, fit, serialization)"
+)
+FORECAST_RESULTS = metrics.registry.counter(
+    "forecast_results_total", "Forecasts answered, by where the result came from"
+)
+
+
+def _phase(name):
+    # time one step of the current request; background jobs report as "background"
+    endpoint = request.url_rule.rule if has_request_context() and request.url_rule else "background"
+    return PHASE_SECONDS.time(endpoint=endpoint, phase=name)
+
+
+@app.before_request
+def _start_timer():
+    g.started = time.perf_counter()
+
+
+@app.after_request
+def _record_request(resp):
+    started = g.pop("started", None)
+    if started is not None:
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            route=request.url_rule.rule if request.url_rule else "unmatched",
+            method=request.method,
+            status=resp.status_code,
+        )
+    metrics.registry.start_flusher()
+    return resp
+
+
+@metrics.registry.collector
+def _collect():
+    # running totals and sizes kept by the caches, single-flight, job queue and Prophet backend
+    caches = {
+        "forecast_memory": forecast_cache,
+        "forecast_disk": forecast_disk,
+        "kpi_query": kpi_query_cache,
+    }
+    for name, cache in caches.items():
+        if cache is None:
+            continue
+        yield "counter", "cache_hits_total", "Cache lookups that found an entry", {"cache": name}, cache.hits
+        yield "counter", "cache_misses_total", "Cache lookups that found nothing", {"cache": name}, cache.misses
+        if isinstance(cache, LRUCache):
+            yield "gauge", "cache_entries", "Entries held in an in-memory cache", {"cache": name}, len(cache)
+
+    flight_help = {
+        "calls": "Calls into a single-flight group",
+        "executions": "Single-flight calls that ran the computation",
+        "coalesced": "Single-flight calls that waited for an identical in-flight computation",
+    }
+    for group, stats in flight.stats().items():
+        for field, value in stats.items():
+            yield "counter", f"singleflight_{field}_total", flight_help[field], {"group": group}, value
+
+    counts = forecast_jobs.counts()
+    for status in (QUEUED, RUNNING, DONE, FAILED):
+        yield "gauge", "forecast_jobs", "Background forecast jobs by status", {"status": status}, counts[status]
+    yield "counter", "forecast_jobs_deduplicated_total", "Job submissions that joined an identical job", {}, \
+        counts["deduplicated"]
+
+    prophet = fit_stats()
+    yield "counter", "prophet_fits_total", "Prophet fits in this process", {}, prophet["fits"]
+    yield "counter", "prophet_warm_starts_total", "Prophet fits seeded from a previous fit", {}, prophet["warm_starts"]
+    yield "counter", "prophet_fit_seconds_total", "Time spent in Prophet fits", {}, prophet["seconds"]
+
 
-df_global = pd.read_parquet(DATA_PATH)
-winners_df = pd.read_json(WINNERS_PATH)
+def reload_data():
+    # re-read every processed file now and warm the derived indexes; serve.py calls this
+    # in the master before re-forking workers so they all share the fresh copy
+    global winners_by_title
+    winners_by_title = load_winners()
+    series_index.refresh()
+    _title_search()
+    kpi_store.refresh()
+    forecast_artifact.refresh()
 
 
 # health check route
@@ -32,20 +192,38 @@ winners_df = pd.read_json(WINNERS_PATH)
 def index():
     return "Job Market Analysis API is running"
 
+def _title_search():
+    # titles with >= 8 months, indexed once per data version
+    return series_index.derived("title_search", TitleSearchIndex.from_store)
+
+
 # list job titles with enough history
 @app.route("/api/titles", methods=["GET"])
 def get_titles():
-    counts = (
-        df_global.groupby("job_title")["month"]
-        .nunique()
-        .reset_index(name="months")
-    )
-    valid_titles = (
-        counts[counts["months"] >= 8]
-        .sort_values("job_title")["job_title"]
-        .tolist()
-    )
-    return jsonify({"titles": valid_titles})
+    return jsonify({"titles": _title_search().titles})
+
+
+@app.route("/api/titles/search", methods=["GET"])
+def search_titles():
+    # ranked, paginated title matches (exact, prefix, word prefix, then substring)
+    q = request.args.get("q", default="", type=str)
+    page = request.args.get("page", default=1, type=int)
+    page_size = request.args.get("page_size", default=TITLE_SEARCH_PAGE_SIZE, type=int)
+
+    if page < 1:
+        return jsonify({"error": "'page' must be >= 1"}), 400
+    if page_size < 1 or page_size > TITLE_SEARCH_MAX_PAGE_SIZE:
+        return jsonify({"error": f"'page_size' must be between 1 and {TITLE_SEARCH_MAX_PAGE_SIZE}"}), 400
+
+    with _phase("title_search"):
+        total, results = _title_search().page(q, page=page, page_size=page_size)
+    return jsonify({
+        "query": q,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "results": results
+    })
 
 @app.route("/api/history", methods=["GET"])
 def get_history():
@@ -54,26 +232,100 @@ def get_history():
     if not title:
         return jsonify({"error": "Missing 'title' parameter"}), 400
 
-    # filter data
-    data = df_global[df_global["job_title"].str.lower() == title.lower()].copy()
+    def build():
+        # precomputed monthly series (already aggregated + sorted)
+        with _phase("series_lookup"):
+            series = series_index.get(title)
+            if series is None:
+                return None
+            return [
+                {"month": m, "avg_salary": float(v)}
+                for m, v in zip(series.labels, series.values)
+            ]
+
+    history = flight.do("history", (series_index.version(), title.lower()), build)
 
-    if data.empty:
+    if history is None:
         return jsonify({"error": f"No data found for title: {title}"}), 404
 
-    # aggregate salary per month
-    monthly = (
-        data.groupby("month", as_index=False)
-            .agg(avg_salary=("avg_salary", "mean"))
-            .sort_values("month")
-    )
+    with _phase("serialize"):
+        return jsonify({
+            "job_title": title,
+            "history": history
+        })
 
-    # convert Timestamp → string for JSON
-    monthly["month"] = monthly["month"].dt.strftime("%Y-%m-01")
 
-    return jsonify({
-        "job_title": title,
-        "history": monthly.to_dict(orient="records")
+def _prepare_forecast(title, horizon):
+    # validate a title and look for a ready forecast (artifact, memory, disk)
+    # returns ({"best_model", "series", "key", "result" or None}, None) or (None, (error, status))
+    best_model = winners_by_title.get(title.lower())
+    if best_model is None:
+        return None, (f"No winner model found for title: {title}", 404)
+
+    # monthly series from the index
+    with _phase("series_lookup"):
+        series = series_index.get(title)
+        if series is None:
+            return None, (f"No data found for title: {title}", 404)
+
+        if len(series.values) < 8:
+            return None, ("Insufficient history (< 8 months) for forecasting", 400)
+
+        fingerprint = series_fingerprint(series.months, series.values)
+    # cache key changes when the model, horizon or this title's data changes
+    key = (title.lower(), best_model, horizon, fingerprint)
+
+    # precomputed artifact first, live fitting only for titles it doesn't cover
+    with _phase("cache_lookup"):
+        source = "artifact"
+        result = forecast_artifact.get(title, best_model, fingerprint, horizon)
+
+        if result is None:
+            source = "memory"
+            result = forecast_cache.get(key)
+        if result is None and forecast_disk is not None:
+            source = "disk"
+            result = forecast_disk.get(key)
+            if result is not None:
+                forecast_cache.set(key, result)
+    if result is not None:
+        FORECAST_RESULTS.inc(source=source)
+
+    return {"best_model": best_model, "series": series, "key": key, "result": result}, None
+
+
+def _store_forecast(key, result):
+    forecast_cache.set(key, result)
+    if forecast_disk is not None:
+        forecast_disk.set(key, result)
+
+
+def _submit_forecast_job(title, prep, horizon):
+    # queue a background fit (shared with any identical in-flight request)
+    # returns (job snapshot, None) or (None, error message)
+    series = prep["series"]
+
+    def fit():
+        with _phase("model_fit"):
+            result, err = forecast_series(prep["best_model"], series.months, series.values, horizon,
+                                          warm_key=title.lower())
+        if err:
+            raise RuntimeError(err)
+        _store_forecast(prep["key"], result)
+        return result
+
+    return forecast_jobs.submit(prep["key"], fit, meta={"job_title": title, "horizon": horizon})
+
+
+def _job_accepted(job):
+    resp = jsonify({
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/api/forecast/jobs/{job['id']}"
     })
+    resp.status_code = 202
+    resp.headers["Location"] = f"/api/forecast/jobs/{job['id']}"
+    return resp
 
 
 @app.route("/api/forecast", methods=["GET"])
@@ -83,150 +335,280 @@ def get_forecast():
 
     if not title:
         return jsonify({"error": "Missing 'title' parameter"}), 400
+    if horizon < 1 or horizon > FORECAST_MAX_HORIZON:
+        return jsonify({"error": f"'horizon' must be between 1 and {FORECAST_MAX_HORIZON}"}), 400
 
-    # get best model for this title
-    row = winners_df[winners_df["job_title"].str.lower() == title.lower()]
-    if row.empty:
-        return jsonify({"error": f"No winner model found for title: {title}"}), 404
-
-    best_model = row.iloc[0]["best_model"]
-
-    # build monthly series
-    data = df_global[df_global["job_title"].str.lower() == title.lower()].copy()
-    if data.empty:
-        return jsonify({"error": f"No data found for title: {title}"}), 404
-
-    monthly = (
-        data.groupby("month", as_index=False)
-            .agg(avg_salary=("avg_salary", "mean"))
-            .sort_values("month")
-            .reset_index(drop=True)
-    )
-
-    if monthly["month"].nunique() < 8:
-        return jsonify({"error": "Insufficient history (< 8 months) for forecasting"}), 400
+    prep, err = _prepare_forecast(title, horizon)
+    if err:
+        return jsonify({"error": err[0]}), err[1]
 
-    # Linear model
-    if best_model == "Linear":
-        X = np.arange(len(monthly)).reshape(-1, 1)
-        y = monthly["avg_salary"].values
+    result = prep["result"]
+    if result is None and prep["best_model"] not in INLINE_MODELS:
+        # cold Prophet fit: hand it to the job queue and let the client poll
+        job, err = _submit_forecast_job(title, prep, horizon)
+        if err:
+            return jsonify({"error": err}), 503
+        FORECAST_RESULTS.inc(source="job")
+        return _job_accepted(job)
+
+    if result is None:
+        # Linear / Holt / ARIMA fits are cheap, answer inline (once for concurrent callers)
+        def fit():
+            series = prep["series"]
+            result, err = forecast_series(prep["best_model"], series.months, series.values, horizon,
+                                          warm_key=title.lower())
+            if not err:
+                _store_forecast(prep["key"], result)
+            return result, err
+
+        with _phase("model_fit"):
+            result, err = flight.do("forecast", prep["key"], fit)
+        if err:
+            return jsonify({"error": err}), 500
+        FORECAST_RESULTS.inc(source="fit")
 
-        model = LinearRegression().fit(X, y)
+    with _phase("serialize"):
+        return jsonify({
+            "job_title": title,
+            "model": result["model"],
+            "forecast": result["forecast"]
+        })
 
-        future_idx = np.arange(len(monthly), len(monthly) + horizon).reshape(-1, 1)
-        preds = model.predict(future_idx)
 
-        dates = pd.date_range(
-            start=monthly["month"].max() + pd.offsets.MonthBegin(1),
-            periods=horizon,
-            freq="MS"
-        )
+@app.route("/api/forecast/batch", methods=["POST"])
+def get_forecast_batch():
+    # many titles in one call: cached ones served directly, Linear fitted in one
+    # vectorized pass, Holt / ARIMA fitted inline, Prophet queued as background jobs;
+    # errors are reported per title
+    body = request.get_json(silent=True) or {}
+    titles = body.get("titles")
+    horizon = body.get("horizon", 6)
+
+    if not isinstance(titles, list) or not titles or not all(isinstance(t, str) and t for t in titles):
+        return jsonify({"error": "'titles' must be a non-empty list of job titles"}), 400
+    if len(titles) > FORECAST_BATCH_MAX_TITLES:
+        return jsonify({"error": f"At most {FORECAST_BATCH_MAX_TITLES} titles per batch"}), 400
+    if not isinstance(horizon, int) or isinstance(horizon, bool) or horizon < 1 or horizon > FORECAST_MAX_HORIZON:
+        return jsonify({"error": f"'horizon' must be an integer between 1 and {FORECAST_MAX_HORIZON}"}), 400
+
+    results = {}
+    pending = {}
+    for title in dict.fromkeys(titles):
+        prep, err = _prepare_forecast(title, horizon)
+        if err:
+            results[title] = {"error": err[0], "status": err[1]}
+        elif prep["result"] is not None:
+            results[title] = prep["result"]
+        else:
+            pending[title] = prep
+
+    # --- Linear: one closed-form fit for every pending title ---
+    linear = [t for t, prep in pending.items() if prep["best_model"] == "Linear"]
+    if linear:
+        with _phase("model_fit"):
+            forecasts = forecast_linear_many(
+                [(pending[t]["series"].months, pending[t]["series"].values) for t in linear], horizon
+            )
+        for title, forecast in zip(linear, forecasts):
+            results[title] = {"model": "Linear", "forecast": forecast}
+            _store_forecast(pending[title]["key"], results[title])
+            FORECAST_RESULTS.inc(source="fit")
+
+    # --- Holt / ARIMA: a few milliseconds each, fitted in this request ---
+    for title, prep in pending.items():
+        if title in results or prep["best_model"] not in INLINE_MODELS:
+            continue
+        series = prep["series"]
+        with _phase("model_fit"):
+            result, err = forecast_series(prep["best_model"], series.months, series.values, horizon)
+        if err:
+            results[title] = {"error": err, "status": 500}
+        else:
+            results[title] = result
+            _store_forecast(prep["key"], result)
+            FORECAST_RESULTS.inc(source="fit")
+
+    # --- everything else (Prophet): queued on the background pool, polled via job id ---
+    jobs = {}
+    for title in pending:
+        if title in results:
+            continue
+        job, err = _submit_forecast_job(title, pending[title], horizon)
+        if err:
+            results[title] = {"error": err, "status": 503}
+        else:
+            jobs[title] = job
+            FORECAST_RESULTS.inc(source="job")
+
+    out = []
+    for title in dict.fromkeys(titles):
+        if title in jobs:
+            job = jobs[title]
+            out.append({
+                "job_title": title,
+                "status": 202,
+                "job_id": job["id"],
+                "job_status": job["status"],
+                "status_url": f"/api/forecast/jobs/{job['id']}"
+            })
+            continue
+        r = results[title]
+        if "error" in r:
+            out.append({"job_title": title, "error": r["error"], "status": r["status"]})
+        else:
+            out.append({"job_title": title, "model": r["model"], "forecast": r["forecast"]})
 
-        forecast = [
-            {
-                "month": d.strftime("%Y-%m-01"),
-                "predicted_salary": float(p)
-            }
-            for d, p in zip(dates, preds)
-        ]
+    return jsonify({
+        "horizon": horizon,
+        "results": out,
+        "errors": sum(1 for r in out if "error" in r),
+        "pending": len(jobs)
+    })
 
-        return jsonify({
-            "job_title": title,
-            "model": "Linear",
-            "forecast": forecast
-        })
 
-    # Prophet model
-    elif best_model.startswith("Prophet") and Prophet is not None:
-        p_df = monthly.rename(columns={"month": "ds", "avg_salary": "y"})[["ds", "y"]]
+@app.route("/api/forecast/jobs/<job_id>", methods=["GET"])
+def get_forecast_job(job_id):
+    # 202 while queued/running, 200 with the forecast when done, 500 if the fit failed
+    job = forecast_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown or expired job: {job_id}"}), 404
 
-        m = Prophet(
-            yearly_seasonality=False,
-            weekly_seasonality=False,
-            daily_seasonality=False,
-            changepoint_prior_scale=0.5
-        )
-        m.fit(p_df)
+    if job["status"] == FAILED:
+        return jsonify({"job_id": job_id, "status": job["status"], "error": job["error"]}), 500
 
-        future = m.make_future_dataframe(periods=horizon, freq="MS")
-        fc = m.predict(future).tail(horizon)[["ds", "yhat", "yhat_lower", "yhat_upper"]]
+    if job["status"] != DONE:
+        return jsonify({"job_id": job_id, "status": job["status"]}), 202
 
-        forecast = [
-            {
-                "month": r["ds"].strftime("%Y-%m-01"),
-                "predicted_salary": float(r["yhat"]),
-                "yhat_lower": float(r["yhat_lower"]),
-                "yhat_upper": float(r["yhat_upper"])
-            }
-            for _, r in fc.iterrows()
-        ]
+    return jsonify({
+        "job_id": job_id,
+        "status": job["status"],
+        "job_title": job["meta"]["job_title"],
+        "model": job["result"]["model"],
+        "forecast": job["result"]["forecast"]
+    })
 
-        return jsonify({
-            "job_title": title,
-            "model": "Prophet",
-            "forecast": forecast
-        })
 
-    else:
-        return jsonify({"error": f"Unsupported model or Prophet not available: {best_model}"}), 500
-    
-def _read_kpi_csv(filename: str):
-    path = KPI_DIR / filename
-    if not path.exists():
-        return None, f"Missing KPI file: {path.as_posix()}. Run python backend/etl/kpi_generate.py"
-    df_kpi = pd.read_csv(path)
-    return df_kpi.to_dict(orient="records"), None
+def _kpi_response(body, etag):
+    # strong ETag on the pre-serialized payload, 304 when the client already has it
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(request)
 
 
 @app.route("/api/kpis", methods=["GET"])
 def get_all_kpis():
     # returns everything in one call (easy for dashboard)
-    if not KPI_DIR.exists():
-        return jsonify({"error": f"Missing KPI folder: {KPI_DIR.as_posix()}"}), 500
-
-    kpi_map = {
-        "top_jobs_openings": "top_jobs_openings.csv",
-        "top_jobs_salary": "top_jobs_salary.csv",
-        "salary_growth_top10": "salary_growth_top10.csv",
-        "salary_spikes_top10": "salary_spikes_top10.csv",
-        "salary_volatility_top10": "salary_volatility_top10.csv",
-        "top_locations_salary": "top_locations_salary.csv",
-    }
-
-    out = {}
-    for key, fname in kpi_map.items():
-        data, err = _read_kpi_csv(fname)
-        if err:
-            return jsonify({"error": err}), 500
-        out[key] = data
+    payload, err = kpi_store.all()
+    if err:
+        return jsonify({"error": err}), 500
 
-    return jsonify(out)
+    return _kpi_response(*payload)
 
 
 @app.route("/api/kpis/<name>", methods=["GET"])
 def get_one_kpi(name):
     # fetch one KPI list by name
-    kpi_map = {
-        "top_jobs_openings": "top_jobs_openings.csv",
-        "top_jobs_salary": "top_jobs_salary.csv",
-        "salary_growth_top10": "salary_growth_top10.csv",
-        "salary_spikes_top10": "salary_spikes_top10.csv",
-        "salary_volatility_top10": "salary_volatility_top10.csv",
-        "top_locations_salary": "top_locations_salary.csv",
-    }
-
-    if name not in kpi_map:
+    if name not in KPI_FILES:
         return jsonify({
             "error": f"Unknown KPI: {name}",
-            "available": sorted(list(kpi_map.keys()))
+            "available": sorted(list(KPI_FILES.keys()))
         }), 404
 
-    data, err = _read_kpi_csv(kpi_map[name])
+    payload, err = kpi_store.one(name)
     if err:
         return jsonify({"error": err}), 500
 
-    return jsonify({"name": name, "data": data})
+    return _kpi_response(*payload)
+
+
+def _parse_month(value):
+    # "YYYY-MM" or "YYYY-MM-DD" -> first of that month; anything else (pandas would also
+    # take "now", "NaT" or a bare year) raises ValueError
+    if not value:
+        return None
+    if not KPI_QUERY_MONTH_RE.fullmatch(value):
+        raise ValueError(f"Not a month: {value}")
+    return pd.Timestamp(value).to_period("M").to_timestamp()
+
+
+@app.route("/api/kpis/query", methods=["GET"])
+def query_kpis():
+    # KPIs computed on demand for any top-N / month window / location cut
+    n = request.args.get("n", default=10, type=int)
+    location = request.args.get("work_location", type=str) or None
+
+    if n < 1 or n > KPI_QUERY_MAX_N:
+        return jsonify({"error": f"'n' must be between 1 and {KPI_QUERY_MAX_N}"}), 400
+
+    try:
+        start = _parse_month(request.args.get("start", type=str))
+        end = _parse_month(request.args.get("end", type=str))
+    except ValueError:
+        return jsonify({"error": "'start' and 'end' must look like YYYY-MM"}), 400
+
+    key = (series_index.version(), n, start, end, location.lower() if location else None)
+    body = kpi_query_cache.get(key)
+
+    if body is None:
+        body = flight.do("kpi_query", key, lambda: _build_kpi_query(key, n, start, end, location))
+
+    if body is None:
+        return jsonify({"error": "No data matches the given filters"}), 404
+
+    return Response(body, mimetype="application/json")
+
+
+def _build_kpi_query(key, n, start, end, location):
+    # serialized KPI payload for one parameter set (cached), None when no rows match
+    store = series_index.store()
+    with _phase("kpi_filter"):
+        keep = store.mask(start=start, end=end, work_location=location)
+        if not keep.any():
+            return None
+        frame = store.to_frame(keep)
+
+    with _phase("kpi_compute"):
+        kpis = compute_kpis(frame, n=n)
+
+    with _phase("serialize"):
+        out = {}
+        for name, table in kpis.items():
+            table = table.copy()
+            if "month" in table.columns:
+                table["month"] = table["month"].dt.strftime("%Y-%m-%d")
+            out[name] = table.to_dict(orient="records")
+
+        body = app.json.dumps({
+            "params": {
+                "n": n,
+                "start": start.strftime("%Y-%m") if start is not None else None,
+                "end": end.strftime("%Y-%m") if end is not None else None,
+                "work_location": location,
+            },
+            "kpis": out,
+        })
+    kpi_query_cache.set(key, body)
+    return body
+
+
+@app.route("/api/stats", methods=["GET"])
+def get_stats():
+    # coalescing, cache and job-queue counters for this process
+    return jsonify({
+        "singleflight": {"in_flight": flight.in_flight(), "groups": flight.stats()},
+        "forecast_jobs": forecast_jobs.counts(),
+        "forecast_cache": {"size": len(forecast_cache), "hits": forecast_cache.hits, "misses": forecast_cache.misses},
+        "kpi_query_cache": {"size": len(kpi_query_cache), "hits": kpi_query_cache.hits, "misses": kpi_query_cache.misses},
+    })
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    # Prometheus text format; under serve.py this merges every worker's numbers
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
 
 
 if __name__ == "__main__":
+    # development server; use serve.py for multi-worker production serving
     app.run(host="127.0.0.1", port=5000, debug=True)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from cube import month_ordinal, ordinal_to_month
+
+
+def _lowercase_lookup(names):
+    # lowercase name -> codes (several spellings can fold to one key)
+    lookup = {}
+    for code, name in enumerate(names):
+        lookup.setdefault(str(name).lower(), []).append(code)
+    return lookup
+
+
+class ColumnarStore:
+    # monthly_aggregates as flat NumPy columns: titles/locations as int32 dictionary codes,
+    # months as int32 month ordinals (months since 1970-01), salaries as float64
+
+    def __init__(self, month, title_codes, titles, location_codes, locations, job_count, avg_salary):
+        self.month = month
+        self.title_codes = title_codes
+        self.titles = titles
+        self.location_codes = location_codes
+        self.locations = locations
+        self.job_count = job_count
+        self.avg_salary = avg_salary
+
+        self.title_lookup = _lowercase_lookup(titles)
+        self.location_lookup = _lowercase_lookup(locations)
+
+    @classmethod
+    def from_frame(cls, df):
+        # works on object or categorical columns (the ETL writes categoricals)
+        titles = pd.Categorical(df["job_title"]).remove_unused_categories()
+        # missing work_location becomes code -1
+        locations = pd.Categorical(df["work_location"]).remove_unused_categories()
+        return cls(
+            month=month_ordinal(df["month"]),
+            title_codes=titles.codes.astype(np.int32),
+            titles=np.asarray(titles.categories, dtype=object),
+            location_codes=locations.codes.astype(np.int32),
+            locations=np.asarray(locations.categories, dtype=object),
+            job_count=df["job_count"].to_numpy(dtype=np.int32),
+            avg_salary=df["avg_salary"].to_numpy(dtype=np.float64),
+        )
+
+    def __len__(self):
+        return len(self.month)
+
+    @property
+    def nbytes(self):
+        columns = (self.month, self.title_codes, self.location_codes, self.job_count, self.avg_salary)
+        return sum(c.nbytes for c in columns)
+
+    def title_codes_for(self, title):
+        return self.title_lookup.get(str(title).lower(), [])
+
+    def mask(self, start=None, end=None, work_location=None, title=None):
+        # integer comparisons only, no string work per row
+        keep = np.ones(len(self), dtype=bool)
+        if start is not None:
+            keep &= self.month >= month_ordinal([start])[0]
+        if end is not None:
+            keep &= self.month <= month_ordinal([end])[0]
+        if work_location is not None:
+            codes = self.location_lookup.get(str(work_location).lower(), [])
+            keep &= np.isin(self.location_codes, codes)
+        if title is not None:
+            keep &= np.isin(self.title_codes, self.title_codes_for(title))
+        return keep
+
+    def months_per_title(self):
+        # distinct months per title code (exact spelling, like groupby("job_title")["month"].nunique())
+        if len(self) == 0:
+            return np.zeros(len(self.titles), dtype=np.int64)
+        span = np.int64(self.month.max()) - np.int64(self.month.min()) + 1
+        pairs = np.unique(self.title_codes.astype(np.int64) * span + (self.month - self.month.min()))
+        return np.bincount(pairs // span, minlength=len(self.titles))
+
+    def to_frame(self, keep=None):
+        # rebuild a monthly_aggregates-shaped frame for the selected rows
+        if keep is None:
+            keep = slice(None)
+        title_codes = self.title_codes[keep]
+        location_codes = self.location_codes[keep]
+        return pd.DataFrame({
+            "month": ordinal_to_month(self.month[keep]),
+            "job_title": pd.Categorical.from_codes(title_codes, categories=self.titles).astype(object),
+            "work_location": pd.Categorical.from_codes(location_codes, categories=self.locations).astype(object),
+            "job_count": self.job_count[keep].astype(np.int64),
+            "avg_salary": self.avg_salary[keep],
+        })
@@ -0,0 +1,198 @@
+import os
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_access import load_monthly_aggregates
+
+CUBE_PATH = Path("data/processed/cube.npz")
+DATA_PATH = Path("data/processed/monthly_aggregates.parquet")
+
+DIMS = ("month", "title", "location")
+# additive measures kept at every level; avg_salary is the per-row monthly average from the ETL
+MEASURES = ("rows", "job_count", "salary_sum", "salary_sumsq", "weighted_salary_sum")
+
+
+def month_ordinal(months):
+    # datetime64 -> int32 months since 1970-01
+    return pd.DatetimeIndex(months).to_period("M").asi8.astype(np.int32)
+
+
+def ordinal_to_month(ordinals):
+    return pd.PeriodIndex.from_ordinals(np.asarray(ordinals, dtype=np.int64), freq="M").to_timestamp()
+
+
+def level_name(dims):
+    return ".".join(dims) if dims else "all"
+
+
+def all_levels():
+    # every node of the month/title/location lattice, finest first
+    return [dims for r in range(len(DIMS), -1, -1) for dims in combinations(DIMS, r)]
+
+
+def _group(codes, dims, measures):
+    # aggregate measures over the unique combinations of `dims`; returns (codes, measures, cells)
+    n = len(next(iter(measures.values()))) if measures else 0
+    if not dims:
+        out_codes = {}
+        inverse = np.zeros(n, dtype=np.int64)
+        size = 1 if n else 0
+    else:
+        stacked = np.stack([codes[d].astype(np.int64) for d in dims], axis=1)
+        uniq, inverse = np.unique(stacked, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        out_codes = {d: uniq[:, i].astype(np.int32) for i, d in enumerate(dims)}
+        size = len(uniq)
+
+    out = {m: np.bincount(inverse, weights=measures[m], minlength=size) for m in measures}
+    cells = np.bincount(inverse, minlength=size)
+    return out_codes, out, cells
+
+
+class Cube:
+    # count / salary-sum / salary-sum-of-squares rollups over month x title x location
+
+    def __init__(self, months, titles, locations, levels):
+        self.months = months          # int32 month ordinals, index = month code
+        self.titles = titles          # title strings, index = title code
+        self.locations = locations    # location strings, index = location code (-1 = missing)
+        self.levels = levels          # level name -> {"codes": {dim: int32[]}, "measures": {m: float64[]}}
+
+        self._title_lookup = {}
+        for code, name in enumerate(titles):
+            self._title_lookup.setdefault(str(name).lower(), []).append(code)
+        self._location_lookup = {}
+        for code, name in enumerate(locations):
+            self._location_lookup.setdefault(str(name).lower(), []).append(code)
+
+    @classmethod
+    def from_frame(cls, df):
+        month_ord = month_ordinal(df["month"])
+        months, month_codes = np.unique(month_ord, return_inverse=True)
+        titles = pd.Categorical(df["job_title"])
+        locations = pd.Categorical(df["work_location"])
+
+        base_codes = {
+            "month": month_codes.reshape(-1).astype(np.int32),
+            "title": titles.codes.astype(np.int32),
+            "location": locations.codes.astype(np.int32),
+        }
+        salary = df["avg_salary"].to_numpy(dtype=float)
+        count = df["job_count"].to_numpy(dtype=float)
+        base = {
+            "rows": np.ones(len(df)),
+            "job_count": count,
+            "salary_sum": salary,
+            "salary_sumsq": salary * salary,
+            "weighted_salary_sum": salary * count,
+        }
+
+        levels = {}
+        for dims in all_levels():
+            codes, measures, _ = _group(base_codes, dims, base)
+            levels[level_name(dims)] = {"codes": codes, "measures": measures}
+
+        return cls(
+            months=months.astype(np.int32),
+            titles=np.asarray(titles.categories, dtype=str),
+            locations=np.asarray(locations.categories, dtype=str),
+            levels=levels,
+        )
+
+    def save(self, path=CUBE_PATH):
+        arrays = {"months": self.months, "titles": self.titles, "locations": self.locations}
+        for name, level in self.levels.items():
+            for d, arr in level["codes"].items():
+                arrays[f"{name}__code__{d}"] = arr
+            for m, arr in level["measures"].items():
+                arrays[f"{name}__measure__{m}"] = arr
+        # write next to the target and swap in, readers never see a partial file
+        path = Path(path)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=CUBE_PATH):
+        with np.load(path, allow_pickle=False) as z:
+            levels = {}
+            for dims in all_levels():
+                name = level_name(dims)
+                levels[name] = {
+                    "codes": {d: z[f"{name}__code__{d}"] for d in dims},
+                    "measures": {m: z[f"{name}__measure__{m}"] for m in MEASURES},
+                }
+            return cls(z["months"], z["titles"], z["locations"], levels)
+
+    def _filter_codes(self, dim, value):
+        # value may be a single value or (start, end) for months
+        if dim == "month":
+            start, end = value if isinstance(value, tuple) else (value, value)
+            lo = month_ordinal([start])[0] if start is not None else np.iinfo(np.int32).min
+            hi = month_ordinal([end])[0] if end is not None else np.iinfo(np.int32).max
+            return np.flatnonzero((self.months >= lo) & (self.months <= hi))
+        lookup = self._title_lookup if dim == "title" else self._location_lookup
+        values = value if isinstance(value, (list, set)) else [value]
+        return np.array([c for v in values for c in lookup.get(str(v).lower(), [])], dtype=np.int32)
+
+    def rollup(self, by=(), where=None, distinct=()):
+        # answer any roll-up from the smallest precomputed level that covers `by` + filtered dims;
+        # `distinct` dims are kept in the source level so "cells" counts them (e.g. months per title)
+        where = where or {}
+        by = tuple(d for d in DIMS if d in by)
+        needed = tuple(d for d in DIMS if d in by or d in where or d in distinct)
+        level = self.levels[level_name(needed)]
+
+        keep = np.ones(len(level["measures"]["rows"]), dtype=bool)
+        for dim, value in where.items():
+            keep &= np.isin(level["codes"][dim], self._filter_codes(dim, value))
+
+        codes = {d: level["codes"][d][keep] for d in needed}
+        measures = {m: level["measures"][m][keep] for m in MEASURES}
+        if "location" in by:
+            # missing locations are dropped, like groupby on work_location
+            has_loc = codes["location"] >= 0
+            codes = {d: c[has_loc] for d, c in codes.items()}
+            measures = {m: v[has_loc] for m, v in measures.items()}
+
+        if needed != by:
+            codes, measures, cells = _group(codes, by, measures)
+        else:
+            cells = np.ones(len(measures["rows"]), dtype=np.int64)
+
+        return self._to_frame(by, codes, measures, cells)
+
+    def _to_frame(self, by, codes, measures, cells):
+        out = {}
+        if "month" in by:
+            out["month"] = ordinal_to_month(self.months[codes["month"]])
+        if "title" in by:
+            out["job_title"] = self.titles[codes["title"]]
+        if "location" in by:
+            out["work_location"] = self.locations[codes["location"]]
+
+        rows = measures["rows"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = measures["salary_sum"] / rows
+            var = (measures["salary_sumsq"] - rows * mean * mean) / (rows - 1)
+            out["rows"] = rows.astype(np.int64)
+            # number of source-level cells merged (distinct values of `distinct` per group)
+            out["cells"] = cells
+            out["job_count"] = measures["job_count"].astype(np.int64)
+            # unweighted mean / sample std of avg_salary rows (what the KPIs and API use)
+            out["avg_salary"] = mean
+            out["salary_std"] = np.sqrt(np.clip(var, 0, None))
+            # posting-weighted average salary
+            out["weighted_avg_salary"] = measures["weighted_salary_sum"] / measures["job_count"]
+        return pd.DataFrame(out)
+
+
+def load_cube(path=CUBE_PATH, data_path=DATA_PATH):
+    # use the prebuilt cube unless it is missing or older than the aggregates
+    path, data_path = Path(path), Path(data_path)
+    if path.exists() and (not data_path.exists() or path.stat().st_mtime >= data_path.stat().st_mtime):
+        return Cube.load(path)
+    return Cube.from_frame(load_monthly_aggregates(data_path))
@@ -0,0 +1,142 @@
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# pyarrow is optional here (pandas falls back to its own parquet engine)
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except Exception:
+    pa = None
+
+DATA_PATH = Path("data/processed/monthly_aggregates.parquet")
+# uncompressed Arrow IPC (Feather v2) copy written next to the parquet by the ETL
+ARROW_PATH = DATA_PATH.with_suffix(".arrow")
+# columns the per-title series helpers need
+SERIES_COLUMNS = ["month", "job_title", "avg_salary"]
+# written by etl/transform_data.py --incremental
+ETL_MANIFEST_PATH = Path("data/processed/etl_manifest.json")
+
+# one point per month for a single (case-folded) job title
+# months: datetime64 array, values: float64 avg_salary, labels: "YYYY-MM-01" strings for JSON
+TitleSeries = namedtuple("TitleSeries", ["months", "values", "labels"])
+
+
+def arrow_path_for(path):
+    return Path(path).with_suffix(".arrow")
+
+
+def write_parquet(df, path):
+    # written aside and swapped in, so the API never reads a half-written file
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def write_arrow(df, path):
+    # uncompressed so readers can memory-map it; written aside and swapped in, so processes
+    # still mapping the old file keep a valid copy. Returns False when pyarrow is missing.
+    if pa is None:
+        return False
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    feather.write_feather(df, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+    return True
+
+
+def load_monthly_aggregates(path=DATA_PATH, columns=None):
+    # job_title / work_location come back as categoricals (dictionary-encoded by the ETL);
+    # `columns` limits what is read at all
+    arrow = arrow_path_for(path)
+    if pa is not None and arrow.exists() and arrow.stat().st_mtime_ns >= Path(path).stat().st_mtime_ns:
+        # memory-mapped: pages come from the shared OS cache and only the selected columns are touched
+        with pa.memory_map(str(arrow), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        # split_blocks keeps numeric columns as views over the mapping instead of consolidating copies
+        return table.to_pandas(split_blocks=True)
+
+    return pd.read_parquet(path, columns=columns)
+
+
+def title_key(title):
+    # every lookup in the backend is case-insensitive on the title
+    return str(title).lower()
+
+
+def load_changed_titles(path=ETL_MANIFEST_PATH):
+    # case-folded titles touched by the last incremental ETL run, None if unknown
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if "changed_titles" not in manifest:
+        return None
+    return {title_key(t) for t in manifest["changed_titles"]}
+
+
+def partition_by_title(df):
+    # lowercase titles once and aggregate every title/month pair in a single groupby
+    keys = df["job_title"].str.lower()
+    monthly = (
+        df.groupby([keys, df["month"]], sort=True)["avg_salary"]
+          .mean()
+    )
+
+    key_arr = monthly.index.get_level_values(0).to_numpy()
+    month_arr = monthly.index.get_level_values(1).to_numpy()
+    value_arr = monthly.to_numpy(dtype=float)
+    label_arr = pd.DatetimeIndex(month_arr).strftime("%Y-%m-01").to_numpy()
+
+    if len(key_arr) == 0:
+        return {}
+
+    # rows are sorted by (key, month) so each title is one contiguous slice
+    starts = np.flatnonzero(np.r_[True, key_arr[1:] != key_arr[:-1]])
+    ends = np.r_[starts[1:], len(key_arr)]
+
+    series = {}
+    for s, e in zip(starts, ends):
+        series[key_arr[s]] = TitleSeries(
+            months=month_arr[s:e],
+            values=value_arr[s:e],
+            labels=label_arr[s:e].tolist(),
+        )
+    return series
+
+
+def monthly_frame(series):
+    # the (month, avg_salary) frame the model scripts work with
+    return pd.DataFrame({"month": series.months, "avg_salary": series.values})
+
+
+def iter_title_series(df, min_months=1, partitions=None):
+    # (job_title, monthly frame) for every title spelling with >= min_months months,
+    # each backed by its case-folded partition
+    if partitions is None:
+        partitions = partition_by_title(df)
+
+    month_counts = df.groupby("job_title", observed=True)["month"].nunique()
+    for job_title, n in month_counts.items():
+        if n < min_months:
+            continue
+        series = partitions.get(title_key(job_title))
+        if series is None:
+            continue
+        yield job_title, monthly_frame(series)
+
+
+def get_title_series(df, title):
+    # single-title lookup for scripts that only model one job
+    data = df[df["job_title"].str.lower() == title_key(title)]
+    if data.empty:
+        return None
+    return partition_by_title(data).get(title_key(title))
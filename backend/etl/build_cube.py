@@ -0,0 +1,28 @@
+import sys
+import time
+
+from pathlib import Path
+
+# shared backend modules live one folder up
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from cube import CUBE_PATH, Cube, all_levels, level_name
+from data_access import load_monthly_aggregates
+
+DATA_PATH = Path("data/processed/monthly_aggregates.parquet")
+
+print(f"Loading: {DATA_PATH}")
+df = load_monthly_aggregates(DATA_PATH)
+
+# materialize every level of the month/title/location lattice
+t0 = time.perf_counter()
+cube = Cube.from_frame(df)
+print(f"Cube built in {time.perf_counter() - t0:.3f}s")
+
+print(f"Dimensions: {len(cube.months)} months, {len(cube.titles)} titles, {len(cube.locations)} locations")
+for dims in all_levels():
+    name = level_name(dims)
+    print(f" - {name:<20} {len(cube.levels[name]['measures']['rows'])} cells")
+
+cube.save(CUBE_PATH)
+print(f"\nCube saved to: {CUBE_PATH}")
@@ -1,53 +1,346 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
 import pandas as pd
 from pathlib import Path
 
+# shared backend modules live one folder up
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from data_access import arrow_path_for, write_arrow, write_parquet
+
 # define file paths
 RAW_PATH = Path("data/raw/job_data_final.xlsx")
 PROCESSED_DIR = Path("data/processed")
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+OUTPUT_PATH = PROCESSED_DIR / "monthly_aggregates.parquet"
+# memory-mappable copy for fast loading (see data_access.load_monthly_aggregates)
+ARROW_OUTPUT_PATH = arrow_path_for(OUTPUT_PATH)
+# high-water mark, processed inputs and changed titles for --incremental runs
+MANIFEST_PATH = PROCESSED_DIR / "etl_manifest.json"
 
-# load dataset
-print(f"Reading dataset: {RAW_PATH}")
-df = pd.read_excel(RAW_PATH)
-
-# standardize column names
-df.columns = [c.strip().lower() for c in df.columns]
-df = df.rename(columns={
+# raw column -> standardized name (only these four are ever used downstream)
+COLUMN_MAP = {
     "business title": "job_title",
     "salary per annum": "salary_annual",
     "posting date": "posting_date",
-    "work location": "work_location"
-})
-
-print("\nColumns standardized:")
-print(df.columns.tolist())
-
-# basic cleaning
-df = df.dropna(subset=["job_title", "salary_annual", "posting_date"])
-df["salary_annual"] = pd.to_numeric(df["salary_annual"], errors="coerce")
-df = df[df["salary_annual"] > 0]
-
-df["posting_date"] = pd.to_datetime(df["posting_date"], errors="coerce")
-df = df.dropna(subset=["posting_date"])
-df["month"] = df["posting_date"].dt.to_period("M").dt.to_timestamp()
-
-# aggregate data (monthly)
-grouped = (
-    df.groupby(["month", "job_title", "work_location"])
-    .agg(
-        job_count=("job_title", "count"),
-        avg_salary=("salary_annual", "mean")
+    "work location": "work_location",
+}
+GROUP_KEYS = ["month", "job_title", "work_location"]
+
+
+def standardize(df):
+    # standardize column names
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    return df.rename(columns=COLUMN_MAP)
+
+
+def clean(df):
+    # basic cleaning
+    df = df.dropna(subset=["job_title", "salary_annual", "posting_date"])
+    df["salary_annual"] = pd.to_numeric(df["salary_annual"], errors="coerce")
+    df = df[df["salary_annual"] > 0]
+
+    df["posting_date"] = pd.to_datetime(df["posting_date"], errors="coerce")
+    df = df.dropna(subset=["posting_date"])
+    df["month"] = df["posting_date"].dt.to_period("M").dt.to_timestamp()
+    return df
+
+
+def partial_aggregate(df):
+    # count + salary sum per group, these add up across chunks (a mean would not)
+    return (
+        df.groupby(GROUP_KEYS)
+        .agg(
+            job_count=("job_title", "count"),
+            salary_sum=("salary_annual", "sum")
+        )
+        .reset_index()
     )
-    .reset_index()
-)
 
-print("\nAggregation complete.")
-print(f"Shape: {grouped.shape}")
-print("Columns:", grouped.columns.tolist())
 
-# save output
-output_path = PROCESSED_DIR / "monthly_aggregates.parquet"
-grouped.to_parquet(output_path, index=False)
+def merge_partials(a, b):
+    if a is None:
+        return b
+    return (
+        pd.concat([a, b], ignore_index=True)
+        .groupby(GROUP_KEYS, as_index=False)[["job_count", "salary_sum"]]
+        .sum()
+    )
+
+
+def subtract_partials(a, b):
+    # a - b per group; groups whose count drops to zero disappear
+    neg = b.copy()
+    neg["job_count"] = -neg["job_count"]
+    neg["salary_sum"] = -neg["salary_sum"]
+    out = merge_partials(a, neg)
+    return out[out["job_count"] != 0].reset_index(drop=True)
+
+
+def partial_to_records(partial):
+    out = partial.copy()
+    out["month"] = out["month"].dt.strftime("%Y-%m-%d")
+    return out.to_dict(orient="records")
+
+
+def partial_from_records(records):
+    out = pd.DataFrame(records, columns=GROUP_KEYS + ["job_count", "salary_sum"])
+    out["month"] = pd.to_datetime(out["month"])
+    return out
+
+
+def to_partial(grouped):
+    # turn saved aggregates back into additive form (avg re-weighted by job_count)
+    out = grouped[GROUP_KEYS + ["job_count"]].copy()
+    out["salary_sum"] = grouped["avg_salary"] * grouped["job_count"]
+    return out
+
+
+def finalize(partial):
+    out = partial.copy()
+    out["avg_salary"] = out["salary_sum"] / out["job_count"]
+    return out[GROUP_KEYS + ["job_count", "avg_salary"]].sort_values(GROUP_KEYS).reset_index(drop=True)
+
+
+def compact(grouped):
+    # dictionary-encode the repeated strings (stored as parquet dictionary pages, read back as
+    # categoricals) and shrink counts; months stay datetime64 and avg_salary float64
+    out = grouped.copy()
+    out["job_title"] = out["job_title"].astype("category")
+    out["work_location"] = out["work_location"].astype("category")
+    out["job_count"] = out["job_count"].astype("int32")
+    return out
+
+
+def _wanted(col):
+    return str(col).strip().lower() in COLUMN_MAP
+
+
+def iter_raw_chunks(path, chunksize):
+    # yield DataFrames of at most `chunksize` rows holding only the four needed columns
+    path = Path(path)
+
+    if path.suffix.lower() == ".csv":
+        yield from pd.read_csv(path, usecols=_wanted, chunksize=chunksize)
+        return
+
+    # openpyxl read-only mode streams rows instead of building the whole sheet in memory
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows)
+        keep = [i for i, c in enumerate(header) if c is not None and _wanted(c)]
+        names = [header[i] for i in keep]
+
+        buf = []
+        for row in rows:
+            buf.append([row[i] if i < len(row) else None for i in keep])
+            if len(buf) >= chunksize:
+                yield pd.DataFrame(buf, columns=names)
+                buf = []
+        if buf:
+            yield pd.DataFrame(buf, columns=names)
+    finally:
+        wb.close()
+
+
+def run_full(raw_path):
+    # load dataset
+    print(f"Reading dataset: {raw_path}")
+    if Path(raw_path).suffix.lower() == ".csv":
+        df = pd.read_csv(raw_path)
+    else:
+        df = pd.read_excel(raw_path)
+
+    df = standardize(df)
+
+    print("\nColumns standardized:")
+    print(df.columns.tolist())
+
+    df = clean(df)
+
+    # aggregate data (monthly)
+    return (
+        df.groupby(GROUP_KEYS)
+        .agg(
+            job_count=("job_title", "count"),
+            avg_salary=("salary_annual", "mean")
+        )
+        .reset_index()
+    )
+
+
+def aggregate_postings(raw_path, chunksize, since=None, inclusive=True):
+    # stream the raw file into partial aggregates, optionally only postings from `since` on
+    # (or strictly after it with inclusive=False)
+    # returns (partial or None, latest posting_date seen, partial of the postings on that date)
+    partial = None
+    latest = None
+    latest_partial = None
+    rows_read = 0
+    for i, chunk in enumerate(iter_raw_chunks(raw_path, chunksize), start=1):
+        rows_read += len(chunk)
+        chunk = clean(standardize(chunk))
+        if since is not None:
+            keep = chunk["posting_date"] >= since if inclusive else chunk["posting_date"] > since
+            chunk = chunk[keep]
+        if chunk.empty:
+            continue
+
+        # the latest date's postings are kept apart too: more can be appended for that
+        # date later, so the next incremental run re-reads it and subtracts this partial
+        newest = chunk["posting_date"].max()
+        on_newest = partial_aggregate(chunk[chunk["posting_date"] == newest])
+        if latest is None or newest > latest:
+            latest, latest_partial = newest, on_newest
+        elif newest == latest:
+            latest_partial = merge_partials(latest_partial, on_newest)
+
+        # memory is bounded by the number of groups, not the number of postings
+        partial = merge_partials(partial, partial_aggregate(chunk))
+        print(f"  chunk {i}: {rows_read} rows read, {len(partial)} groups")
+
+    return partial, latest, latest_partial
+
+
+def run_streaming(raw_path, chunksize):
+    print(f"Streaming dataset: {raw_path} (chunks of {chunksize} rows)")
+
+    partial, _, _ = aggregate_postings(raw_path, chunksize)
+    if partial is None:
+        return pd.DataFrame(columns=GROUP_KEYS + ["job_count", "avg_salary"])
+    return finalize(partial)
+
+
+def file_fingerprint(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime": st.st_mtime, "sha256": h.hexdigest()}
+
+
+def load_manifest():
+    if not MANIFEST_PATH.exists():
+        return {}
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest):
+    tmp = MANIFEST_PATH.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def run_incremental(raw_path, chunksize):
+    # returns (aggregates or None if nothing changed, manifest to save)
+    manifest = load_manifest()
+    inputs = manifest.get("inputs", {})
+    fingerprint = file_fingerprint(raw_path)
+    input_key = Path(raw_path).as_posix()
+
+    manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    first_run = not OUTPUT_PATH.exists() or not manifest.get("high_water_mark")
+
+    if not first_run and inputs.get(input_key, {}).get("sha256") == fingerprint["sha256"]:
+        print(f"Input unchanged since last run: {input_key}")
+        manifest["changed_titles"] = []
+        return None, manifest
+
+    hwm = None if first_run else pd.Timestamp(manifest["high_water_mark"])
+    # postings on the high-water-mark date that the last run already aggregated
+    hwm_partial = None if first_run else manifest.get("high_water_mark_partial")
+    if first_run:
+        print(f"No previous run found, aggregating everything in: {raw_path}")
+    elif hwm_partial is None:
+        # manifest from before the mark's own postings were recorded: fall back to strictly newer
+        print(f"Aggregating postings after high-water mark {hwm.date()} in: {raw_path}")
+    else:
+        print(f"Aggregating postings from high-water mark {hwm.date()} on in: {raw_path}")
+
+    new_partial, latest, latest_partial = aggregate_postings(
+        raw_path, chunksize, since=hwm, inclusive=hwm_partial is not None
+    )
+
+    inputs[input_key] = fingerprint
+    manifest["inputs"] = inputs
+
+    if new_partial is not None and hwm_partial:
+        # the mark's date was re-read in full; only what was appended for it since is new
+        new_partial = subtract_partials(new_partial, partial_from_records(hwm_partial))
+
+    if new_partial is None or new_partial.empty:
+        print("No new postings found")
+        manifest["changed_titles"] = []
+        return None, manifest
+
+    if first_run:
+        grouped = finalize(new_partial)
+    else:
+        existing = pd.read_parquet(OUTPUT_PATH)
+        grouped = finalize(merge_partials(to_partial(existing), new_partial))
+
+    manifest["high_water_mark"] = latest.isoformat()
+    manifest["high_water_mark_partial"] = partial_to_records(latest_partial)
+    # downstream stages (compare_many.py --changed-only) recompute just these
+    manifest["changed_titles"] = sorted(new_partial["job_title"].unique().tolist())
+    print(f"New groups: {len(new_partial)}, titles changed: {len(manifest['changed_titles'])}")
+    return grouped, manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate raw postings into monthly_aggregates.parquet")
+    parser.add_argument("--input", type=Path, default=RAW_PATH, help="raw postings file (.xlsx or .csv)")
+    parser.add_argument("--stream", action="store_true",
+                        help="read only the needed columns in bounded chunks (flat memory)")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="rows per chunk in --stream mode")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only aggregate postings from the last run's posting_date high-water mark on "
+                             "and merge them into the existing parquet (assumes append-only raw data)")
+    args = parser.parse_args()
+
+    manifest = None
+    if args.incremental:
+        grouped, manifest = run_incremental(args.input, args.chunksize)
+        if grouped is None:
+            save_manifest(manifest)
+            print("monthly_aggregates.parquet is up to date.")
+            return
+    elif args.stream:
+        grouped = run_streaming(args.input, args.chunksize)
+    else:
+        grouped = run_full(args.input)
+
+    print("\nAggregation complete.")
+    print(f"Shape: {grouped.shape}")
+    print("Columns:", grouped.columns.tolist())
+
+    # save output (parquet first: the arrow copy is only used when it is at least as new)
+    grouped = compact(grouped)
+    write_parquet(grouped, OUTPUT_PATH)
+    if write_arrow(grouped, ARROW_OUTPUT_PATH):
+        print(f"Arrow copy saved to: {ARROW_OUTPUT_PATH}")
+
+    if manifest is not None:
+        save_manifest(manifest)
+        print(f"Manifest updated: {MANIFEST_PATH}")
+    elif MANIFEST_PATH.exists():
+        # a full rebuild invalidates the incremental high-water mark
+        MANIFEST_PATH.unlink()
+
+    print(f"\n Processed data saved to: {OUTPUT_PATH}")
+    print("ETL process completed successfully.")
+
 
-print(f"\n Processed data saved to: {output_path}")
-print("ETL process completed successfully.")
+if __name__ == "__main__":
+    main()
@@ -1,86 +1,213 @@
-import pandas as pd
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# headless backend, set before pyplot is imported (also in the worker processes)
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+import numpy as np
 from pathlib import Path
 
+# shared backend modules live one folder up
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from cube import CUBE_PATH, load_cube
+from data_access import SERIES_COLUMNS, load_monthly_aggregates, partition_by_title
+
 # define file paths
 PROCESSED_PATH = Path("data/processed/monthly_aggregates.parquet")
 PLOT_DIR = Path("data/processed/plots")
-PLOT_DIR.mkdir(parents=True, exist_ok=True)
-
-# load processed dataset
-print(f"Loading processed data from: {PROCESSED_PATH}")
-df = pd.read_parquet(PROCESSED_PATH)
-
-# top 10 job titles by total postings
-top_jobs = (
-    df.groupby("job_title")["job_count"]
-    .sum()
-    .sort_values(ascending=False)
-    .head(10)
-)
-
-plt.figure(figsize=(10,6))
-top_jobs.plot(kind='bar', color='skyblue')
-plt.title("Top 10 Job Titles by Job Count")
-plt.xlabel("Job Title")
-plt.ylabel("Total Postings")
-plt.xticks(rotation=45, ha='right')
-plt.tight_layout()
-plt.savefig(PLOT_DIR / "top_job_titles.png")
-plt.close()
-print("Saved: top_job_titles.png")
-
-# top 10 locations by job count
-top_locations = (
-    df.groupby("work_location")["job_count"]
-    .sum()
-    .sort_values(ascending=False)
-    .head(10)
-)
-
-plt.figure(figsize=(10,6))
-top_locations.plot(kind='bar', color='lightgreen')
-plt.title("Top 10 Locations by Job Count")
-plt.xlabel("Work Location")
-plt.ylabel("Total Postings")
-plt.xticks(rotation=45, ha='right')
-plt.tight_layout()
-plt.savefig(PLOT_DIR / "top_locations.png")
-plt.close()
-print("Saved: top_locations.png")
-
-# top 10 job titles by average salary
-avg_salary = (
-    df.groupby("job_title")["avg_salary"]
-    .mean()
-    .sort_values(ascending=False)
-    .head(10)
-)
-
-plt.figure(figsize=(10,6))
-avg_salary.plot(kind='bar', color='salmon')
-plt.title("Top 10 Job Titles by Average Salary")
-plt.xlabel("Job Title")
-plt.ylabel("Average Salary (Annual)")
-plt.xticks(rotation=45, ha='right')
-plt.tight_layout()
-plt.savefig(PLOT_DIR / "top_salary_titles.png")
-plt.close()
-print("Saved: top_salary_titles.png")
-
-# salary trend over time for a popular job title
-selected_title = top_jobs.index[0]  # most common job
-trend = df[df["job_title"] == selected_title].groupby("month")["avg_salary"].mean()
-
-plt.figure(figsize=(10,6))
-plt.plot(trend.index, trend.values, marker='o', color='orange')
-plt.title(f"Salary Trend Over Time: {selected_title}")
-plt.xlabel("Month")
-plt.ylabel("Average Salary")
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig(PLOT_DIR / f"salary_trend_{selected_title.replace(' ', '_')}.png")
-plt.close()
-print(f"Saved: salary_trend_{selected_title.replace(' ', '_')}.png")
-
-print("\n Visualization complete. All plots saved in data/processed/plots/")
+TREND_DIR = PLOT_DIR / "trends"
+MANIFEST_PATH = TREND_DIR / "manifest.json"
+
+# bump when the trend chart layout changes so every plot is re-rendered
+TREND_STYLE = 1
+MIN_MONTHS = 8
+
+# one figure per process, cleared and reused for every chart
+_fig = None
+
+
+def get_axes():
+    global _fig
+    if _fig is None:
+        _fig = plt.figure(figsize=(10, 6))
+    _fig.clf()
+    return _fig.add_subplot(111)
+
+
+def save(path):
+    _fig.tight_layout()
+    _fig.savefig(path)
+
+
+def bar_chart(series, color, title, xlabel, ylabel, filename):
+    ax = get_axes()
+    series.plot(kind='bar', color=color, ax=ax)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    save(PLOT_DIR / filename)
+    print(f"Saved: {filename}")
+
+
+def trend_chart(months, values, title, path):
+    ax = get_axes()
+    ax.plot(months, values, marker='o', color='orange')
+    ax.set_title(f"Salary Trend Over Time: {title}")
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Average Salary")
+    plt.setp(ax.get_xticklabels(), rotation=45)
+    save(path)
+
+
+def render_trends(tasks):
+    # worker: (title, months, values, path) tuples, all drawn on this process's figure
+    for title, months, values, path in tasks:
+        trend_chart(months, values, title, path)
+    return len(tasks)
+
+
+def series_hash(months, values):
+    h = hashlib.sha1(f"style={TREND_STYLE}".encode())
+    h.update(np.ascontiguousarray(months, dtype="datetime64[ns]").view(np.int64).tobytes())
+    h.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def trend_filename(key):
+    # readable slug + short hash so titles differing only in punctuation never collide
+    slug = re.sub(r"[^a-z0-9]+", "_", key).strip("_")[:60] or "title"
+    return f"{slug}_{hashlib.sha1(key.encode()).hexdigest()[:8]}.png"
+
+
+def load_manifest():
+    if not MANIFEST_PATH.exists():
+        return {}
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f).get("plots", {})
+
+
+def save_manifest(plots):
+    tmp = MANIFEST_PATH.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"style": TREND_STYLE, "plots": plots}, f, indent=2)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def summary_charts(cube):
+    by_title = cube.rollup(by=("title",)).set_index("job_title")
+
+    # top 10 job titles by total postings
+    top_jobs = by_title["job_count"].sort_values(ascending=False).head(10)
+    bar_chart(top_jobs, 'skyblue', "Top 10 Job Titles by Job Count",
+              "Job Title", "Total Postings", "top_job_titles.png")
+
+    # top 10 locations by job count
+    top_locations = (
+        cube.rollup(by=("location",))
+        .set_index("work_location")["job_count"]
+        .sort_values(ascending=False)
+        .head(10)
+    )
+    bar_chart(top_locations, 'lightgreen', "Top 10 Locations by Job Count",
+              "Work Location", "Total Postings", "top_locations.png")
+
+    # top 10 job titles by average salary
+    avg_salary = by_title["avg_salary"].sort_values(ascending=False).head(10)
+    bar_chart(avg_salary, 'salmon', "Top 10 Job Titles by Average Salary",
+              "Job Title", "Average Salary (Annual)", "top_salary_titles.png")
+
+    # salary trend over time for a popular job title
+    selected_title = top_jobs.index[0]  # most common job
+    # cube filters match titles case-insensitively, so keep only this exact spelling
+    trend = cube.rollup(by=("month", "title"), where={"title": selected_title})
+    trend = trend[trend["job_title"] == selected_title].set_index("month")["avg_salary"]
+    filename = f"salary_trend_{selected_title.replace(' ', '_')}.png"
+    trend_chart(trend.index, trend.values, selected_title, PLOT_DIR / filename)
+    print(f"Saved: {filename}")
+
+
+def title_trends(workers, force, min_months):
+    # one trend plot per (case-folded) title with enough history, skipping unchanged series
+    df = load_monthly_aggregates(PROCESSED_PATH, columns=SERIES_COLUMNS)
+    partitions = partition_by_title(df)
+
+    # display name: first spelling of each case-folded title
+    names = {}
+    for t in df["job_title"].astype(str).unique():
+        names.setdefault(t.lower(), t)
+
+    # the old manifest is still read on --force, to delete plots of titles that are gone
+    previous = load_manifest()
+    plots = {}
+    tasks = []
+    for key, series in partitions.items():
+        if len(series.values) < min_months:
+            continue
+        entry = {
+            "job_title": names.get(key, key),
+            "file": trend_filename(key),
+            "series_hash": series_hash(series.months, series.values),
+            "points": len(series.values),
+        }
+        plots[key] = entry
+
+        old = previous.get(key)
+        if not force and old == entry and (TREND_DIR / entry["file"]).exists():
+            continue
+        tasks.append((entry["job_title"], series.months, series.values, TREND_DIR / entry["file"]))
+
+    # drop plots for titles that disappeared or fell below the threshold
+    for key, old in previous.items():
+        if key not in plots:
+            (TREND_DIR / old["file"]).unlink(missing_ok=True)
+
+    print(f"Trend plots: {len(plots)} titles, {len(tasks)} to render, {len(plots) - len(tasks)} unchanged")
+
+    started = time.perf_counter()
+    workers = max(1, min(workers, len(tasks) or 1))
+    if workers == 1:
+        render_trends(tasks)
+    else:
+        # one batch per worker so each process reuses a single figure across its charts
+        batches = [tasks[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(render_trends, batches))
+    print(f"Rendered {len(tasks)} trend plots with {workers} worker(s) in {time.perf_counter() - started:.2f}s")
+
+    save_manifest(plots)
+    print(f"Manifest saved: {MANIFEST_PATH}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render summary charts and per-title salary trend plots")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for trend plots (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="re-render every trend plot")
+    parser.add_argument("--min-months", type=int, default=MIN_MONTHS,
+                        help="only plot titles with at least this many months")
+    args = parser.parse_args()
+
+    PLOT_DIR.mkdir(parents=True, exist_ok=True)
+    TREND_DIR.mkdir(parents=True, exist_ok=True)
+
+    # load the rollup cube (rebuilt from the parquet if etl/build_cube.py hasn't run)
+    print(f"Loading cube from: {CUBE_PATH} (source: {PROCESSED_PATH})")
+    cube = load_cube(CUBE_PATH, PROCESSED_PATH)
+    summary_charts(cube)
+
+    title_trends(args.workers, args.force, args.min_months)
+
+    print("\n Visualization complete. All plots saved in data/processed/plots/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+
+def _records(group):
+    out = []
+    for month, pred, lo, hi in zip(group["month"], group["predicted_salary"],
+                                   group["yhat_lower"], group["yhat_upper"]):
+        r = {"month": month, "predicted_salary": float(pred)}
+        # linear forecasts have no interval
+        if pd.notna(lo) and pd.notna(hi):
+            r["yhat_lower"] = float(lo)
+            r["yhat_upper"] = float(hi)
+        out.append(r)
+    return out
+
+
+class ForecastArtifact:
+    # title.lower() -> precomputed max-horizon forecast, reloaded when the artifact changes
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._state = (None, {})
+
+    def refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            # no artifact yet (or being replaced), keep whatever we have
+            return self._state[1]
+
+        if mtime == self._state[0]:
+            return self._state[1]
+
+        with self._lock:
+            if mtime == self._state[0]:
+                return self._state[1]
+
+            df = pd.read_parquet(self.path).sort_values(["title_key", "step"])
+            entries = {}
+            for key, group in df.groupby("title_key", sort=False):
+                first = group.iloc[0]
+                entries[key] = {
+                    "best_model": first["best_model"],
+                    "model": first["model"],
+                    "fingerprint": first["fingerprint"],
+                    "forecast": _records(group),
+                }
+            self._state = (mtime, entries)
+            return entries
+
+    def get(self, title, best_model, fingerprint, horizon):
+        # only serve when the artifact was built from the same model + data and is long enough
+        entry = self.refresh().get(title.lower())
+        if entry is None:
+            return None
+        if entry["best_model"] != best_model or entry["fingerprint"] != fingerprint:
+            return None
+        if horizon < 1 or horizon > len(entry["forecast"]):
+            return None
+        return {"model": entry["model"], "forecast": entry["forecast"][:horizon]}
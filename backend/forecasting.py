@@ -0,0 +1,118 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+import metrics
+import ts_models
+from cache import LRUCache
+from prophet_backend import Prophet, fit_prophet, warm_params_of
+from trend import forecast_trends
+
+# longest horizon precomputed by models/precompute_forecasts.py
+MAX_HORIZON = 24
+
+# models cheap enough to fit inside a request (closed form or a few ms of statsmodels);
+# everything else goes through the background job queue
+INLINE_MODELS = ("Linear", "Holt", "ARIMA")
+
+# fit + predict time per model, wherever forecasts are produced (API, jobs, precompute)
+FIT_SECONDS = metrics.registry.histogram(
+    "forecast_fit_duration_seconds", "Time to fit a model and extend it over the horizon"
+)
+
+# last Prophet parameters per title, so a refit on slightly extended data starts near the optimum
+_warm_params = LRUCache(max_size=1024)
+
+
+def series_fingerprint(months, values):
+    # changes whenever the ETL rewrites any point of this title's series
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(months, dtype="datetime64[ns]").view(np.int64).tobytes())
+    h.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def future_months(last_month, horizon):
+    return pd.date_range(
+        start=pd.Timestamp(last_month) + pd.offsets.MonthBegin(1),
+        periods=horizon,
+        freq="MS"
+    )
+
+
+def forecast_linear(months, values, horizon):
+    return forecast_linear_many([(months, values)], horizon)[0]
+
+
+def forecast_linear_many(series_list, horizon):
+    # every (months, values) pair fitted and extended in one vectorized pass
+    with FIT_SECONDS.time(model="Linear"):
+        preds = forecast_trends([values for _, values in series_list], horizon)
+
+    return [
+        [
+            {
+                "month": d.strftime("%Y-%m-01"),
+                "predicted_salary": float(p)
+            }
+            for d, p in zip(future_months(months[-1], horizon), row)
+        ]
+        for (months, _), row in zip(series_list, preds)
+    ]
+
+
+def forecast_ts(name, months, values, horizon):
+    # Holt / ARIMA from ts_models.py; ARIMA also reports an interval band
+    with FIT_SECONDS.time(model=name):
+        preds, band = ts_models.forecast(name, values, horizon)
+    out = []
+    for i, (d, p) in enumerate(zip(future_months(months[-1], horizon), preds)):
+        r = {"month": d.strftime("%Y-%m-01"), "predicted_salary": float(p)}
+        if band is not None:
+            r["yhat_lower"] = float(band[0][i])
+            r["yhat_upper"] = float(band[1][i])
+        out.append(r)
+    return out
+
+
+def forecast_prophet(months, values, horizon, warm_key=None):
+    p_df = pd.DataFrame({"ds": months, "y": values})
+
+    warm = _warm_params.get(warm_key) if warm_key is not None else None
+    with FIT_SECONDS.time(model="Prophet"):
+        m, _ = fit_prophet(p_df, warm_params=warm, changepoint_prior_scale=0.5)
+        if warm_key is not None:
+            _warm_params.set(warm_key, warm_params_of(m))
+
+        future = m.make_future_dataframe(periods=horizon, freq="MS")
+        fc = m.predict(future).tail(horizon)[["ds", "yhat", "yhat_lower", "yhat_upper"]]
+
+    return [
+        {
+            "month": r["ds"].strftime("%Y-%m-01"),
+            "predicted_salary": float(r["yhat"]),
+            "yhat_lower": float(r["yhat_lower"]),
+            "yhat_upper": float(r["yhat_upper"])
+        }
+        for _, r in fc.iterrows()
+    ]
+
+
+def forecast_series(best_model, months, values, horizon, warm_key=None):
+    # returns ({"model", "forecast"}, None) or (None, error message);
+    # warm_key (e.g. the case-folded title) lets Prophet warm-start from that title's last fit
+    if best_model == "Linear":
+        return {"model": "Linear", "forecast": forecast_linear(months, values, horizon)}, None
+
+    if best_model in ts_models.MODELS and ts_models.available():
+        try:
+            forecast = forecast_ts(best_model, months, values, horizon)
+        except Exception as e:
+            return None, f"{best_model} fit failed: {e}"
+        return {"model": best_model, "forecast": forecast}, None
+
+    if best_model.startswith("Prophet") and Prophet is not None:
+        return {"model": "Prophet", "forecast": forecast_prophet(months, values, horizon, warm_key=warm_key)}, None
+
+    return None, f"Unsupported model or its library is not available: {best_model}"
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def job_id_for(key):
+    # the same key gives the same id in every worker process
+    return hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+    # bounded background pool for slow work (Prophet fits); identical in-flight jobs are shared.
+    # With shared_dir, job state is also written there (one JSON file per job) so that the
+    # forked workers behind serve.py can answer status polls and join each other's jobs.
+
+    def __init__(self, max_workers=2, max_pending=64, keep_seconds=600, shared_dir=None, stale_seconds=300):
+        self.max_pending = max_pending
+        self.keep_seconds = keep_seconds
+        # a queued/running shared job not updated for this long belongs to a worker that died
+        self.stale_seconds = stale_seconds
+        self.shared_dir = Path(shared_dir) if shared_dir is not None else None
+        if self.shared_dir is not None:
+            self.shared_dir.mkdir(parents=True, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs = {}        # job id -> job dict
+        self._in_flight = {}   # dedup key -> job id while queued/running
+        self.deduplicated = 0  # submissions that joined an existing job
+
+    def submit(self, key, fn, meta=None):
+        # returns (job snapshot, None) or (None, error message) when the queue is full
+        job_id = job_id_for(key)
+        with self._lock:
+            self._prune()
+
+            if key in self._in_flight:
+                self.deduplicated += 1
+                return self._snapshot(self._jobs[self._in_flight[key]]), None
+
+            # another worker is already on it (or just finished it); a failed job is retried
+            shared = self._read_shared(job_id)
+            if shared is not None and (shared["status"] == DONE or self._live(shared)):
+                self.deduplicated += 1
+                return shared, None
+
+            if len(self._in_flight) >= self.max_pending:
+                return None, "Forecast queue is full, try again shortly"
+
+            job = {
+                "id": job_id,
+                "key": key,
+                "status": QUEUED,
+                "meta": dict(meta or {}),
+                "result": None,
+                "error": None,
+                "created": time.time(),
+                "finished": None,
+            }
+            self._jobs[job["id"]] = job
+            self._in_flight[key] = job["id"]
+            self._write_shared(job)
+
+        self._pool.submit(self._run, job, fn)
+        return self._snapshot(job), None
+
+    def _run(self, job, fn):
+        with self._lock:
+            job["status"] = RUNNING
+            self._write_shared(job)
+        try:
+            result = fn()
+            status, error = DONE, None
+        except Exception as e:
+            result, status, error = None, FAILED, str(e)
+
+        with self._lock:
+            job["result"] = result
+            job["error"] = error
+            job["status"] = status
+            job["finished"] = time.time()
+            self._in_flight.pop(job["key"], None)
+            self._write_shared(job)
+
+    def get(self, job_id):
+        # this worker's jobs first, then the ones other workers wrote to shared_dir
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return self._snapshot(job)
+        shared = self._read_shared(job_id)
+        if shared is not None and shared["status"] in (QUEUED, RUNNING) and not self._live(shared):
+            return dict(shared, status=FAILED, error="The worker running this job exited, please retry")
+        return shared
+
+    def counts(self):
+        with self._lock:
+            out = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                out[job["status"]] += 1
+            out["deduplicated"] = self.deduplicated
+            return out
+
+    def _prune(self):
+        # forget finished jobs after keep_seconds (caller holds the lock)
+        cutoff = time.time() - self.keep_seconds
+        for job_id in [i for i, j in self._jobs.items() if j["finished"] is not None and j["finished"] < cutoff]:
+            del self._jobs[job_id]
+        if self.shared_dir is not None:
+            for path in self.shared_dir.glob("*.json"):
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def _live(self, shared):
+        # queued/running and still owned by a worker that is alive
+        return shared["status"] in (QUEUED, RUNNING) and time.time() - shared["updated"] < self.stale_seconds
+
+    def _shared_path(self, job_id):
+        return self.shared_dir / f"{job_id}.json"
+
+    def _write_shared(self, job):
+        # written aside and swapped in, readers in other workers never see a partial file
+        if self.shared_dir is None:
+            return
+        path = self._shared_path(job["id"])
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dict(self._snapshot(job), updated=time.time()), f)
+            os.replace(tmp, path)
+        except OSError:
+            # the local queue still works, other workers just can't see this job
+            pass
+
+    def _read_shared(self, job_id):
+        if self.shared_dir is None or not all(c in "0123456789abcdef" for c in job_id):
+            return None
+        try:
+            with open(self._shared_path(job_id), "r", encoding="utf-8") as f:
+                shared = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if time.time() - shared["updated"] > self.keep_seconds and shared["status"] in (DONE, FAILED):
+            return None
+        return shared
+
+    @staticmethod
+    def _snapshot(job):
+        return {k: job[k] for k in ("id", "status", "meta", "result", "error")}
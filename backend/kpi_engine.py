@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+
+def top_n(df, col, n):
+    # partial top-k selection instead of a full sort; NaNs go last like sort_values(ascending=False)
+    top = df.nlargest(n, col, keep="first")
+    if len(top) < n:
+        top = pd.concat([top, df[df[col].isna()].head(n - len(top))])
+    return top
+
+
+def title_stats(sorted_df):
+    # every per-title statistic in one grouped aggregation over a (job_title, month) sorted frame
+    return (
+        sorted_df.groupby("job_title", sort=True, observed=True)
+        .agg(
+            job_count=("job_count", "sum"),
+            avg_salary=("avg_salary", "mean"),
+            salary_std=("avg_salary", "std"),
+            first_salary=("avg_salary", "first"),
+            last_salary=("avg_salary", "last"),
+            max_pct_change=("salary_pct_change", "max"),
+        )
+        .reset_index()
+    )
+
+
+def add_pct_change(sorted_df):
+    # month-over-month % change within each title without a second groupby pass
+    titles = sorted_df["job_title"].to_numpy()
+    salary = sorted_df["avg_salary"].to_numpy(dtype=float)
+
+    pct = np.full(len(salary), np.nan)
+    if len(salary) > 1:
+        same_title = titles[1:] == titles[:-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = (salary[1:] / salary[:-1] - 1.0) * 100
+        pct[1:] = np.where(same_title, change, np.nan)
+
+    out = sorted_df.copy()
+    out["salary_pct_change"] = pct
+    return out
+
+
+def compute_kpis(df, n=10):
+    # the six KPI tables written by etl/kpi_generate.py (and served by the API)
+    tmp = add_pct_change(df.sort_values(["job_title", "month"]))
+    stats = title_stats(tmp)
+
+    # --- KPI 1: Top jobs by total openings ---
+    top_jobs_openings = top_n(stats[["job_title", "job_count"]], "job_count", n)
+
+    # --- KPI 2: Top jobs by highest average salary ---
+    top_jobs_salary = top_n(stats[["job_title", "avg_salary"]], "avg_salary", n)
+
+    # --- KPI 3: Salary growth leaders (first vs last month %) ---
+    first_last = stats[["job_title", "first_salary", "last_salary"]].copy()
+    first_last["growth_pct"] = (first_last["last_salary"] - first_last["first_salary"]) / first_last["first_salary"] * 100
+    first_last = (
+        first_last.replace([float("inf"), float("-inf")], np.nan)
+                  .dropna(subset=["growth_pct"])
+    )
+    salary_growth = top_n(first_last, "growth_pct", n)
+
+    # --- KPI 4: Salary spike events (largest MoM % change) ---
+    spikes = tmp.dropna(subset=["salary_pct_change"])
+    salary_spikes = top_n(spikes, "salary_pct_change", n)[["job_title", "month", "avg_salary", "salary_pct_change"]]
+
+    # --- KPI 5: Most volatile salaries (std dev) ---
+    salary_volatility = top_n(stats[["job_title", "salary_std"]], "salary_std", n)
+
+    # --- KPI 6: Top locations by salary ---
+    locations = df.groupby("work_location", as_index=False, observed=True)["avg_salary"].mean()
+    top_locations_salary = top_n(locations, "avg_salary", n)
+
+    return {
+        "top_jobs_openings": top_jobs_openings,
+        "top_jobs_salary": top_jobs_salary,
+        "salary_growth_top10": salary_growth,
+        "salary_spikes_top10": salary_spikes,
+        "salary_volatility_top10": salary_volatility,
+        "top_locations_salary": top_locations_salary,
+    }
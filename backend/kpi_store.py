@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+# KPI name -> CSV written by etl/kpi_generate.py
+KPI_FILES = {
+    "top_jobs_openings": "top_jobs_openings.csv",
+    "top_jobs_salary": "top_jobs_salary.csv",
+    "salary_growth_top10": "salary_growth_top10.csv",
+    "salary_spikes_top10": "salary_spikes_top10.csv",
+    "salary_volatility_top10": "salary_volatility_top10.csv",
+    "top_locations_salary": "top_locations_salary.csv",
+}
+
+
+def _etag(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+class KpiStore:
+    # KPI CSVs parsed once and kept as ready-to-send JSON bytes, reloaded when a file's mtime changes
+
+    def __init__(self, kpi_dir, dumps=json.dumps):
+        self.dir = Path(kpi_dir)
+        self.dumps = dumps
+        self._lock = threading.Lock()
+        # (mtimes, payload) swapped together
+        self._state = (None, None)
+
+    def _mtimes(self):
+        out = []
+        for fname in KPI_FILES.values():
+            try:
+                out.append(os.stat(self.dir / fname).st_mtime_ns)
+            except FileNotFoundError:
+                out.append(None)
+        return tuple(out)
+
+    def _load(self):
+        if not self.dir.exists():
+            return {"error": f"Missing KPI folder: {self.dir.as_posix()}"}
+
+        records, errors = {}, {}
+        for name, fname in KPI_FILES.items():
+            path = self.dir / fname
+            if not path.exists():
+                errors[name] = f"Missing KPI file: {path.as_posix()}. Run python backend/etl/kpi_generate.py"
+                continue
+            records[name] = pd.read_csv(path).to_dict(orient="records")
+
+        # pre-serialize every response the KPI endpoints can return
+        one = {}
+        for name, data in records.items():
+            body = self.dumps({"name": name, "data": data}).encode("utf-8")
+            one[name] = (body, _etag(body))
+
+        all_ = None
+        if not errors:
+            all_body = self.dumps(records).encode("utf-8")
+            all_ = (all_body, _etag(all_body))
+
+        return {"error": None, "errors": errors, "all": all_, "one": one}
+
+    def refresh(self):
+        mtimes = self._mtimes()
+        if mtimes == self._state[0]:
+            return self._state[1]
+
+        with self._lock:
+            mtimes = self._mtimes()
+            if mtimes != self._state[0]:
+                self._state = (mtimes, self._load())
+            return self._state[1]
+
+    def all(self):
+        # ((body, etag), None) or (None, error)
+        payload = self.refresh()
+        if payload["error"]:
+            return None, payload["error"]
+        if payload["errors"]:
+            # first missing file in KPI order, same as reading them one by one
+            return None, next(iter(payload["errors"].values()))
+        return payload["all"], None
+
+    def one(self, name):
+        payload = self.refresh()
+        if payload["error"]:
+            return None, payload["error"]
+        if name in payload["errors"]:
+            return None, payload["errors"][name]
+        return payload["one"][name], None
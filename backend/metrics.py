@@ -0,0 +1,253 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# latency buckets in seconds: sub-ms cache hits up to multi-second model fits
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# how often a worker rewrites its snapshot file (multi-process mode only)
+FLUSH_INTERVAL = 5.0
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Counter:
+    def __init__(self, registry, name, help):
+        self._registry = registry
+        self.name = name
+        self.help = help
+
+    def inc(self, value=1, **labels):
+        key = _labels_key(labels)
+        with self._registry._lock:
+            values = self._registry._counters[self.name]
+            values[key] = values.get(key, 0) + value
+
+
+class Histogram:
+    def __init__(self, registry, name, help, buckets):
+        self._registry = registry
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+
+    def observe(self, seconds, **labels):
+        key = _labels_key(labels)
+        # first bucket whose upper bound holds the value, len(buckets) = +Inf
+        i = next((i for i, b in enumerate(self.buckets) if seconds <= b), len(self.buckets))
+        with self._registry._lock:
+            values = self._registry._histograms[self.name]
+            h = values.get(key)
+            if h is None:
+                h = values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+            h["counts"][i] += 1
+            h["sum"] += seconds
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+
+class Registry:
+    # counters + latency histograms for this process, rendered as Prometheus text.
+    # With a shared directory (serve.py), every worker writes its snapshot there and
+    # render() merges them, so a scrape that lands on any worker sees the whole server.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+        self._dir = None
+        self._flusher_pid = None
+
+    def counter(self, name, help):
+        self._meta[name] = ("counter", help, None)
+        self._counters.setdefault(name, {})
+        return Counter(self, name, help)
+
+    def histogram(self, name, help, buckets=BUCKETS):
+        self._meta[name] = ("histogram", help, tuple(buckets))
+        self._histograms.setdefault(name, {})
+        return Histogram(self, name, help, buckets)
+
+    def collector(self, fn):
+        # fn() -> iterable of (kind, name, help, labels, value), read at scrape time;
+        # kind is "counter" for running totals kept elsewhere (cache hits) or "gauge"
+        self._collectors.append(fn)
+        return fn
+
+    def use_directory(self, path):
+        # multi-process mode: call once in the master before forking; stale files from a
+        # previous server run are removed
+        self._dir = Path(path)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        for p in self._dir.glob("*.json"):
+            p.unlink(missing_ok=True)
+
+    def reset(self):
+        # forked workers start from zero instead of repeating the master's numbers
+        self._lock = threading.Lock()
+        for values in list(self._counters.values()) + list(self._histograms.values()):
+            values.clear()
+
+    def snapshot(self):
+        collected = []
+        for fn in self._collectors:
+            for kind, name, help, labels, value in fn():
+                self._meta.setdefault(name, (kind, help, None))
+                collected.append([kind, name, list(_labels_key(labels)), value])
+
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "counters": [[n, list(k), v] for n, values in self._counters.items() for k, v in values.items()],
+                "histograms": [
+                    [n, list(k), list(h["counts"]), h["sum"]]
+                    for n, values in self._histograms.items() for k, h in values.items()
+                ],
+                "collected": collected,
+                "meta": {n: [kind, help, buckets] for n, (kind, help, buckets) in self._meta.items()},
+            }
+
+    def start_flusher(self):
+        # cheap enough to call on every request: the first call in each (forked) worker
+        # starts a thread that rewrites its snapshot every FLUSH_INTERVAL, so idle workers
+        # are never more than one interval behind
+        if self._dir is None or self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def flush(self, snap=None):
+        if self._dir is None:
+            return
+        snap = snap or self.snapshot()
+        path = self._dir / f"{snap['pid']}.json"
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snap, f)
+        os.replace(tmp, path)
+
+    def _snapshots(self):
+        own = self.snapshot()
+        if self._dir is None:
+            return [own]
+        self.flush(own)
+
+        out = [own]
+        for p in self._dir.glob("*.json"):
+            if p.stem == str(own["pid"]):
+                continue
+            try:
+                with open(p, "r", encoding="utf-8") as f:
+                    out.append(json.load(f))
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+        return out
+
+    def render(self):
+        counters = {}
+        histograms = {}
+        gauges = {}
+        meta = {}
+
+        for snap in self._snapshots():
+            meta.update({n: tuple(m) for n, m in snap["meta"].items()})
+            # retired workers keep their totals (counters never go backwards), not their gauges
+            alive = _alive(snap["pid"])
+            for n, k, v in snap["counters"]:
+                key = (n, tuple(map(tuple, k)))
+                counters[key] = counters.get(key, 0) + v
+            for n, k, counts, total in snap["histograms"]:
+                key = (n, tuple(map(tuple, k)))
+                h = histograms.setdefault(key, [[0] * len(counts), 0.0])
+                h[0] = [a + b for a, b in zip(h[0], counts)]
+                h[1] += total
+            for kind, n, k, v in snap["collected"]:
+                key = (n, tuple(map(tuple, k)))
+                if kind == "counter":
+                    counters[key] = counters.get(key, 0) + v
+                elif alive:
+                    gauges[key] = gauges.get(key, 0) + v
+
+        lines = []
+        for name in sorted(meta):
+            kind, help, buckets = meta[name]
+            series = counters if kind == "counter" else histograms if kind == "histogram" else gauges
+            rows = sorted((k, v) for (n, k), v in series.items() if n == name)
+            if not rows:
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in rows:
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                counts, total = value
+                running = 0
+                for le, c in zip(list(buckets) + [math.inf], counts):
+                    running += c
+                    le_label = labels + (("le", "+Inf" if le == math.inf else repr(float(le))),)
+                    lines.append(f"{name}_bucket{_format_labels(le_label)} {running}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {running}")
+        return "\n".join(lines) + "\n"
+
+
+def _alive(pid):
+    # os.kill(pid, 0) would terminate the process on Windows (no multi-process mode there anyway)
+    if pid == os.getpid() or os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # exists but owned by someone else, or the platform can't tell: keep it
+        return True
+    return True
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# one registry per process
+registry = Registry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry.reset)
@@ -0,0 +1,198 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# shared backend modules live one folder up
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import ts_models
+from data_access import DATA_PATH, SERIES_COLUMNS, iter_title_series, load_monthly_aggregates
+from prophet_backend import Prophet, fit_prophet, warm_params_of
+from trend import backtest_trends
+
+# paths
+PLOT_DIR = Path("data/processed/plots")
+FOLDS_PATH = PLOT_DIR / "model_backtest_folds.csv"
+SUMMARY_PATH = PLOT_DIR / "model_backtest_summary.csv"
+
+# expanding-window folds anchored at the end of each series: the last fold tests the
+# final HORIZON months, each earlier fold moves the origin back HORIZON months
+FOLDS = 4
+HORIZON = 3
+MIN_TRAIN = 5
+
+# summary column prefix per model (same layout as model_comparison_summary.csv)
+PREFIXES = {"Linear": "lin", "Holt": "holt", "ARIMA": "arima", "Prophet": "prophet"}
+
+
+def fold_origins(n, folds, horizon, min_train):
+    # train on values[:origin], test on values[origin:origin + horizon]
+    origins = [n - horizon * k for k in range(folds, 0, -1)]
+    return [o for o in origins if o >= min_train]
+
+
+def fold_row(job_title, model, fold, origin, months, actual, pred, seconds, warm):
+    row = {
+        "job_title": job_title,
+        "model": model,
+        "fold": fold,
+        "test_start": pd.Timestamp(months[origin]).strftime("%Y-%m-01"),
+        "train_months": origin,
+        "test_months": len(actual),
+        "rmse": None,
+        "mape": None,
+        "fit_seconds": seconds,
+        "warm_start": warm,
+    }
+    if pred is not None and np.all(np.isfinite(pred)):
+        row["rmse"], row["mape"] = ts_models.errors(actual, pred)
+    return row
+
+
+def backtest_title(job_title, months, values, origins, horizon, warm_start=True):
+    # Holt, ARIMA and Prophet over every fold of one title; returns (fold rows, seconds)
+    t0 = time.perf_counter()
+    rows = []
+
+    # Holt / ARIMA: a few ms each, fitted cold (see ts_models.fit)
+    models = list(ts_models.MODELS) if ts_models.available() else []
+    for name in models:
+        for fold, origin in enumerate(origins):
+            actual = values[origin:origin + horizon]
+            pred = None
+            f0 = time.perf_counter()
+            try:
+                pred, _ = ts_models.forecast(name, values[:origin], len(actual))
+            except Exception:
+                pass
+            rows.append(fold_row(job_title, name, fold, origin, months, actual, pred,
+                                 time.perf_counter() - f0, False))
+
+    # Prophet: oldest fold first, each fit starts from the previous fold's optimum
+    if Prophet is not None:
+        warm = None
+        for fold, origin in enumerate(origins):
+            actual = values[origin:origin + horizon]
+            train = pd.DataFrame({"ds": months[:origin], "y": values[:origin]})
+            m = pred = None
+            f0 = time.perf_counter()
+            try:
+                # no uncertainty simulation, only yhat is scored
+                m, seconds = fit_prophet(train, uncertainty=False, warm_params=warm)
+                fut = m.make_future_dataframe(periods=len(actual), freq="MS")
+                pred = m.predict(fut)["yhat"].values[-len(actual):]
+            except Exception:
+                seconds = time.perf_counter() - f0
+            rows.append(fold_row(job_title, "Prophet", fold, origin, months, actual, pred,
+                                 seconds, warm is not None))
+            # a failed fold leaves nothing to warm-start the next one from
+            warm = warm_params_of(m) if warm_start and m is not None else None
+
+    return rows, time.perf_counter() - t0
+
+
+def summarize(folds, job_titles):
+    # fold means per title and model; a model that failed on any fold gets no score
+    summary = pd.DataFrame({"job_title": job_titles}).set_index("job_title")
+    summary["folds"] = folds[folds["model"] == "Linear"].groupby("job_title")["fold"].count()
+
+    for model, prefix in PREFIXES.items():
+        g = folds[folds["model"] == model].groupby("job_title")
+        complete = g["mape"].count() == g["fold"].count()
+        summary[f"{prefix}_rmse"] = g["rmse"].mean().where(complete)
+        summary[f"{prefix}_mape"] = g["mape"].mean().where(complete)
+    return summary.reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of every candidate model")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: all cores, 1 = run serially)")
+    parser.add_argument("--folds", type=int, default=FOLDS, help="folds per title")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="months tested per fold")
+    parser.add_argument("--min-train", type=int, default=MIN_TRAIN,
+                        help="skip folds with fewer training months than this")
+    parser.add_argument("--cold", action="store_true",
+                        help="fit every Prophet fold from scratch instead of warm-starting from the previous fold")
+    args = parser.parse_args()
+
+    PLOT_DIR.mkdir(parents=True, exist_ok=True)
+
+    # titles with at least 8 monthly records, same set as compare_many.py
+    df = load_monthly_aggregates(DATA_PATH, columns=SERIES_COLUMNS)
+    jobs = []
+    for job_title, monthly in iter_title_series(df, min_months=8):
+        months = monthly["month"].values
+        values = monthly["avg_salary"].values.astype(float)
+        origins = fold_origins(len(values), args.folds, args.horizon, args.min_train)
+        if origins:
+            jobs.append((job_title, months, values, origins))
+
+    print(f"Backtesting {len(jobs)} titles, up to {args.folds} folds of {args.horizon} months")
+    started = time.perf_counter()
+    # job_title -> fold rows, Linear first
+    rows = {}
+
+    # ---------------- Linear ----------------
+    # every fold of every title from running sums, one vectorized pass
+    preds = backtest_trends([values for _, _, values, _ in jobs],
+                            [origins for _, _, _, origins in jobs], args.horizon)
+    for (job_title, months, values, origins), pred in zip(jobs, preds):
+        rows[job_title] = []
+        for fold, origin in enumerate(origins):
+            actual = values[origin:origin + args.horizon]
+            rows[job_title].append(fold_row(job_title, "Linear", fold, origin, months, actual,
+                                            pred[fold][:len(actual)], None, False))
+    print(f"Linear: {sum(len(o) for *_, o in jobs)} folds in {time.perf_counter() - started:.3f}s")
+
+    # ---------------- Holt / ARIMA / Prophet ----------------
+    # titles in parallel; within a title the folds run in order to chain warm starts
+    workers = max(1, min(args.workers, len(jobs) or 1))
+    print(f"Holt, ARIMA and Prophet with {workers} worker(s)" + (" (cold starts)" if args.cold else ""))
+    done = 0
+
+    def report(job_title, fold_rows, seconds):
+        nonlocal done
+        done += 1
+        rows[job_title].extend(fold_rows)
+        print(f"  [{done}/{len(jobs)}] {job_title}: {seconds:.2f}s")
+
+    if workers == 1:
+        for job_title, months, values, origins in jobs:
+            fold_rows, seconds = backtest_title(job_title, months, values, origins, args.horizon, not args.cold)
+            report(job_title, fold_rows, seconds)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(backtest_title, job_title, months, values, origins, args.horizon, not args.cold): job_title
+                for job_title, months, values, origins in jobs
+            }
+            for fut in as_completed(futures):
+                fold_rows, seconds = fut.result()
+                report(futures[fut], fold_rows, seconds)
+
+    print(f"Done in {time.perf_counter() - started:.2f}s")
+
+    # original title order, so the CSV matches a serial run
+    folds = pd.DataFrame([r for job_title, *_ in jobs for r in rows[job_title]])
+
+    # Linear has no per-fold fit time (all folds share the vectorized pass above)
+    fit_time = folds.dropna(subset=["fit_seconds"]).groupby("model", sort=False)["fit_seconds"]
+    print("\nFit time per model:")
+    print(fit_time.agg(["count", "sum", "mean"]).to_string())
+
+    folds.to_csv(FOLDS_PATH, index=False)
+    print(f"\nSaved per-fold metrics: {FOLDS_PATH}")
+
+    summarize(folds, [job_title for job_title, *_ in jobs]).to_csv(SUMMARY_PATH, index=False)
+    print(f"Saved summary: {SUMMARY_PATH}")
+
+
+if __name__ == "__main__":
+    main()
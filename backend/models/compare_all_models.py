@@ -1,21 +1,19 @@
+import sys
+
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import matplotlib.pyplot as plt
-from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import PolynomialFeatures
 from sklearn.metrics import mean_squared_error, mean_absolute_percentage_error
 
-# try prophet import
-try:
-    from prophet import Prophet
-except Exception:
-    try:
-        from fbprophet import Prophet
-    except Exception:
-        Prophet = None
+# shared backend modules live one folder up
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from data_access import DATA_PATH, SERIES_COLUMNS, get_title_series, load_monthly_aggregates, monthly_frame
+from prophet_backend import Prophet, fit_prophet
+from trend import fit_line
 
-DATA_PATH = Path("data/processed/monthly_aggregates.parquet")
 PLOT_DIR = Path("data/processed/plots")
 PLOT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -26,18 +24,13 @@ def rmse(y_true, y_pred): return float(mean_squared_error(y_true, y_pred) ** 0.5
 def mape(y_true, y_pred): return float(mean_absolute_percentage_error(y_true, y_pred) * 100)
 
 # --- Load and aggregate to one row per month (aligns all models) ---
-df = pd.read_parquet(DATA_PATH)
-data = df[df["job_title"].str.lower() == job_title.lower()].copy()
-if data.empty:
+df = load_monthly_aggregates(DATA_PATH, columns=SERIES_COLUMNS)
+series = get_title_series(df, job_title)
+if series is None:
     raise ValueError(f"No records found for job title: {job_title}")
 
-# aggregate across locations → one value per month
-monthly = (
-    data.groupby("month", as_index=False)
-        .agg(avg_salary=("avg_salary", "mean"))
-        .sort_values("month")
-        .reset_index(drop=True)
-)
+# already aggregated across locations → one value per month
+monthly = monthly_frame(series)
 if monthly["month"].nunique() < 8:
     raise ValueError(f"Need at least 8 monthly points, found {monthly['month'].nunique()}.")
 
@@ -53,10 +46,10 @@ X_tr, X_te = X_all[:split], X_all[split:]
 y_tr, y_te = y_all[:split], y_all[split:]
 months_tr, months_te = months[:split], months[split:]
 
-# --- Linear ---
-lin = LinearRegression().fit(X_tr, y_tr)
-y_fit_lin = lin.predict(X_all)
-y_pred_lin = lin.predict(X_te)
+# --- Linear (closed-form trend on the train split) ---
+slope, intercept = fit_line(y_tr)
+y_fit_lin = intercept + slope * X_all[:, 0]
+y_pred_lin = intercept + slope * X_te[:, 0]
 rmse_lin = rmse(y_te, y_pred_lin)
 mape_lin = mape(y_te, y_pred_lin)
 
@@ -69,8 +62,8 @@ if Prophet is not None:
     split_idx = int(len(p_df)*0.8)
     train, test = p_df.iloc[:split_idx].copy(), p_df.iloc[split_idx:].copy()
 
-    m = Prophet(yearly_seasonality=False, weekly_seasonality=False, daily_seasonality=False, changepoint_prior_scale=0.5)
-    m.fit(train)
+    m, fit_seconds = fit_prophet(train, uncertainty=False, changepoint_prior_scale=0.5)
+    print(f"Prophet fit in {fit_seconds:.3f}s")
 
     in_sample = m.predict(pd.DataFrame({"ds": p_df["ds"]}))
     y_fit_prophet = in_sample["yhat"].values
@@ -1,21 +1,30 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
-import numpy as np
 from pathlib import Path
-from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import PolynomialFeatures
 from sklearn.metrics import mean_squared_error, mean_absolute_percentage_error
 
-# try prophet (skip if not installed)
-try:
-    from prophet import Prophet
-except Exception:
-    Prophet = None
+# shared backend modules live one folder up
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from data_access import DATA_PATH, SERIES_COLUMNS, iter_title_series, load_changed_titles, load_monthly_aggregates, title_key
+import ts_models
+from prophet_backend import Prophet, fit_prophet
+from trend import fit_trends
 
 # paths
-DATA_PATH = Path("data/processed/monthly_aggregates.parquet")
 PLOT_DIR = Path("data/processed/plots")
 PLOT_DIR.mkdir(parents=True, exist_ok=True)
 
+# per-title (non-vectorized) candidates and their summary columns
+TS_COLUMNS = {"Holt": ("holt_rmse", "holt_mape"), "ARIMA": ("arima_rmse", "arima_mape")}
+PER_TITLE_COLUMNS = [c for cols in TS_COLUMNS.values() for c in cols] + ["prophet_rmse", "prophet_mape"]
+
 # metric helpers
 def rmse(y_true, y_pred):
     return float(mean_squared_error(y_true, y_pred) ** 0.5)
@@ -23,63 +32,15 @@ def rmse(y_true, y_pred):
 def mape(y_true, y_pred):
     return float(mean_absolute_percentage_error(y_true, y_pred) * 100)
 
-# load dataset
-df = pd.read_parquet(DATA_PATH)
-
-# automatically select job titles with at least 8 monthly records
-titles = (
-    df.groupby("job_title")["month"]
-      .nunique()
-      .reset_index()
-      .query("month >= 8")
-      ["job_title"]
-      .tolist()
-)
-
-print("Job titles with >= 8 months of data:")
-for t in titles:
-    print(" -", t)
-
-records = []
-
-# loop through each job title
-for job_title in titles:
-    print(f"\nProcessing: {job_title}")
-
-    data = df[df["job_title"].str.lower() == job_title.lower()].copy()
-    if data.empty:
-        print("  Skipped (not found)")
-        continue
-
-    # monthly average
-    monthly = (
-        data.groupby("month", as_index=False)
-            .agg(avg_salary=("avg_salary", "mean"))
-            .sort_values("month")
-            .reset_index(drop=True)
-    )
-
-    if monthly["month"].nunique() < 8:
-        print(f"  Skipped (only {monthly['month'].nunique()} months)")
-        continue
-
-    # prepare features
-    monthly["t"] = np.arange(len(monthly))
-    X_all = monthly[["t"]].values
-    y_all = monthly["avg_salary"].values
-
-    # split train/test
-    split = int(len(monthly) * 0.8)
-    X_tr, X_te = X_all[:split], X_all[split:]
-    y_tr, y_te = y_all[:split], y_all[split:]
 
-    # ---------------- Linear ----------------
-    lin = LinearRegression().fit(X_tr, y_tr)
-    y_pred_lin = lin.predict(X_te)
-    rmse_lin = rmse(y_te, y_pred_lin)
-    mape_lin = mape(y_te, y_pred_lin)
+def evaluate_title(job_title, monthly):
+    # Holt, ARIMA and Prophet on one title's monthly series, returns (metrics, seconds)
+    t0 = time.perf_counter()
+
+    metrics = {}
+    for name, (rmse_col, mape_col) in TS_COLUMNS.items():
+        metrics[rmse_col], metrics[mape_col] = ts_models.score(name, monthly["avg_salary"].values, train_frac=0.8)
 
-    # ---------------- Prophet ----------------
     rmse_prophet = None
     mape_prophet = None
 
@@ -88,12 +49,8 @@ for job_title in titles:
         split_idx = int(len(p_df) * 0.8)
         train, test = p_df.iloc[:split_idx], p_df.iloc[split_idx:]
 
-        m = Prophet(
-            yearly_seasonality=False,
-            weekly_seasonality=False,
-            daily_seasonality=False
-        )
-        m.fit(train)
+        # shared Stan backend, no uncertainty simulation (only yhat is scored)
+        m, _ = fit_prophet(train, uncertainty=False)
 
         fut = m.make_future_dataframe(periods=len(test), freq="MS")
         fc_all = m.predict(fut)
@@ -108,14 +65,97 @@ for job_title in titles:
             rmse_prophet = rmse(test["y"].values, pred_test["yhat"].values)
             mape_prophet = mape(test["y"].values, pred_test["yhat"].values)
 
-    # store results
-    records.append({
-        "job_title": job_title,
-        "lin_rmse": rmse_lin, "lin_mape": mape_lin,
-        "prophet_rmse": rmse_prophet, "prophet_mape": mape_prophet
-    })
-
-# save CSV
-out_csv = PLOT_DIR / "model_comparison_summary.csv"
-pd.DataFrame(records).to_csv(out_csv, index=False)
-print(f"\nSaved summary: {out_csv}")
+    metrics["prophet_rmse"] = rmse_prophet
+    metrics["prophet_mape"] = mape_prophet
+    return metrics, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Linear, Holt, ARIMA and Prophet for every title with enough history")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: all cores, 1 = run serially)")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="refit per-title models only for titles changed by the last incremental ETL run, "
+                             "reusing the rest from the existing summary")
+    args = parser.parse_args()
+
+    out_csv = PLOT_DIR / "model_comparison_summary.csv"
+
+    # load dataset
+    df = load_monthly_aggregates(DATA_PATH, columns=SERIES_COLUMNS)
+
+    # one groupby partitions every title; keep titles with at least 8 monthly records
+    jobs = list(iter_title_series(df, min_months=8))
+
+    print("Job titles with >= 8 months of data:")
+    for job_title, _ in jobs:
+        print(" -", job_title)
+
+    started = time.perf_counter()
+
+    # ---------------- Linear ----------------
+    # closed-form fit + 80/20 test metrics for every title in one vectorized pass
+    lin = fit_trends([monthly["avg_salary"].values for _, monthly in jobs], train_frac=0.8)
+    linear = {
+        job_title: {"lin_rmse": float(lin["rmse"][i]), "lin_mape": float(lin["mape"][i])}
+        for i, (job_title, _) in enumerate(jobs)
+    }
+    print(f"\nLinear fitted for {len(jobs)} titles in {time.perf_counter() - started:.3f}s")
+
+    # ---------------- Holt / ARIMA / Prophet ----------------
+    results = {}
+    if args.changed_only:
+        changed = load_changed_titles()
+        if changed is None or not out_csv.exists():
+            print("No incremental ETL manifest or previous summary, evaluating every title")
+        else:
+            # unchanged titles keep their previous metrics (unless the summary predates a model)
+            for r in pd.read_csv(out_csv).to_dict(orient="records"):
+                if title_key(r["job_title"]) not in changed and all(c in r for c in PER_TITLE_COLUMNS):
+                    results[r["job_title"]] = {c: r[c] for c in PER_TITLE_COLUMNS}
+
+    todo = [(job_title, monthly) for job_title, monthly in jobs if job_title not in results]
+    if results:
+        print(f"Reusing per-title metrics for {len(jobs) - len(todo)} unchanged titles")
+
+    workers = max(1, min(args.workers, len(todo) or 1))
+    print(f"Evaluating Holt, ARIMA and Prophet for {len(todo)} titles with {workers} worker(s)")
+
+    done = 0
+
+    def report(job_title, metrics, seconds):
+        nonlocal done
+        done += 1
+        results[job_title] = metrics
+        print(f"  [{done}/{len(todo)}] {job_title}: {seconds:.2f}s")
+
+    if workers == 1:
+        for job_title, monthly in todo:
+            metrics, seconds = evaluate_title(job_title, monthly)
+            report(job_title, metrics, seconds)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(evaluate_title, job_title, monthly): job_title
+                for job_title, monthly in todo
+            }
+            # stream records back as each title finishes
+            for fut in as_completed(futures):
+                metrics, seconds = fut.result()
+                report(futures[fut], metrics, seconds)
+
+    print(f"Done in {time.perf_counter() - started:.2f}s")
+
+    # keep the original title order so the CSV matches a serial run
+    records = [
+        {"job_title": job_title, **linear[job_title], **results[job_title]}
+        for job_title, _ in jobs
+    ]
+
+    # save CSV
+    pd.DataFrame(records).to_csv(out_csv, index=False)
+    print(f"\nSaved summary: {out_csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,39 @@
+import sys
+
 import pandas as pd
-import numpy as np
 from pathlib import Path
-from sklearn.linear_model import LinearRegression
 import matplotlib.pyplot as plt
 from datetime import timedelta
 
+# shared backend modules live one folder up
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from data_access import DATA_PATH, SERIES_COLUMNS, get_title_series, load_monthly_aggregates, monthly_frame
+from trend import forecast_trends
+
 # define file paths
-DATA_PATH = Path("data/processed/monthly_aggregates.parquet")
 MODEL_OUTPUT = Path("data/processed/plots")
 MODEL_OUTPUT.mkdir(parents=True, exist_ok=True)
 
 # load data
 print(f"Loading data from: {DATA_PATH}")
-df = pd.read_parquet(DATA_PATH)
+df = load_monthly_aggregates(DATA_PATH, columns=SERIES_COLUMNS)
 
 # choose a job title to model (is changeable)
 job_title = "Assistant Project Manager"
 
-# filter data for that job title
-data = df[df["job_title"].str.lower() == job_title.lower()].copy()
-if data.empty:
+# monthly series for that job title (one point per month, sorted)
+series = get_title_series(df, job_title)
+if series is None:
     raise ValueError(f"No records found for job title: {job_title}")
 
-# sort by month
-data = data.sort_values("month")
-
-# convert month to numeric index for regression
-data["month_num"] = np.arange(len(data))
-
-# define features and target
-X = data[["month_num"]]
-y = data["avg_salary"]
-
-# create and train model
-model = LinearRegression()
-model.fit(X, y)
+data = monthly_frame(series)
 
-# predict next 6 months
+# fit the closed-form trend on the month index and predict next 6 months
 future_steps = 6
-future_months = np.arange(len(data), len(data) + future_steps)
 future_dates = pd.date_range(start=data["month"].max() + pd.offsets.MonthBegin(1), periods=future_steps, freq="MS")
 
-future_preds = model.predict(future_months.reshape(-1, 1))
+future_preds = forecast_trends([data["avg_salary"].values], future_steps)[0]
 
 # combine results
 forecast_df = pd.DataFrame({
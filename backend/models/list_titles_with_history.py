@@ -1,21 +1,26 @@
-import pandas as pd
+import sys
+
 from pathlib import Path
 
-# load processed data
-df = pd.read_parquet(Path("data/processed/monthly_aggregates.parquet"))
+# shared backend modules live one folder up
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from cube import load_cube
+
+# load the rollup cube (rebuilt from the parquet if etl/build_cube.py hasn't run)
+cube = load_cube()
+
+# months of history per title ("cells" = distinct months merged into each title)
+hist = cube.rollup(by=("title",), distinct=("month",))
+hist = hist.rename(columns={"cells": "months", "job_count": "total_posts"})
 
-# ensure sorted months
-df = df.sort_values(["job_title", "month"])
+# first / last month from the (much smaller) month x title level
+span = cube.rollup(by=("month", "title")).groupby("job_title")["month"].agg(["min", "max"])
+hist["first"] = hist["job_title"].map(span["min"])
+hist["last"] = hist["job_title"].map(span["max"])
 
-# months of history per title
 hist = (
-    df.groupby("job_title")
-      .agg(months=("month", "nunique"),
-           total_posts=("job_count", "sum"),
-           first=("month", "min"),
-           last=("month", "max"),
-           avg_salary=("avg_salary", "mean"))
-      .reset_index()
+    hist[["job_title", "months", "total_posts", "first", "last", "avg_salary"]]
       .sort_values(["months","total_posts"], ascending=[False, False])
 )
 
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# shared backend modules live one folder up
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from data_access import DATA_PATH, SERIES_COLUMNS, load_monthly_aggregates, partition_by_title, title_key
+from forecasting import MAX_HORIZON, forecast_series, series_fingerprint
+
+# paths
+WINNERS_PATH = Path("data/processed/plots/model_winners.json")
+OUT_PATH = Path("data/processed/forecasts.parquet")
+
+# load data + winners from summarize_winners.py
+print(f"Loading data from: {DATA_PATH}")
+series_by_title = partition_by_title(load_monthly_aggregates(DATA_PATH, columns=SERIES_COLUMNS))
+winners = pd.read_json(WINNERS_PATH)
+
+rows = []
+done = set()
+failed = []
+
+for job_title, best_model in zip(winners["job_title"], winners["best_model"]):
+    key = title_key(job_title)
+    if key in done:
+        continue
+    done.add(key)
+
+    series = series_by_title.get(key)
+    if series is None or len(series.values) < 8:
+        print(f"  Skipped {job_title} (not enough history)")
+        continue
+
+    t0 = time.perf_counter()
+    result, err = forecast_series(best_model, series.months, series.values, MAX_HORIZON)
+    if err:
+        print(f"  Skipped {job_title} ({err})")
+        failed.append(job_title)
+        continue
+
+    fingerprint = series_fingerprint(series.months, series.values)
+    for step, r in enumerate(result["forecast"], start=1):
+        rows.append({
+            "title_key": key,
+            "best_model": best_model,
+            "model": result["model"],
+            "fingerprint": fingerprint,
+            "step": step,
+            "month": r["month"],
+            "predicted_salary": r["predicted_salary"],
+            "yhat_lower": r.get("yhat_lower"),
+            "yhat_upper": r.get("yhat_upper"),
+        })
+    print(f"  {job_title}: {result['model']} ({time.perf_counter() - t0:.2f}s)")
+
+out = pd.DataFrame(rows, columns=[
+    "title_key", "best_model", "model", "fingerprint", "step",
+    "month", "predicted_salary", "yhat_lower", "yhat_upper",
+])
+
+# write next to the final file and swap, so the API never reads a partial artifact
+tmp_path = OUT_PATH.with_suffix(".parquet.tmp")
+out.to_parquet(tmp_path, index=False)
+os.replace(tmp_path, OUT_PATH)
+
+print(f"\nSaved {out['title_key'].nunique()} forecasts ({MAX_HORIZON} months each): {OUT_PATH}")
+if failed:
+    print(f"Failed: {len(failed)} titles (served by live fitting instead)")
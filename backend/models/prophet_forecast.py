@@ -1,16 +1,16 @@
-import pandas as pd
+import sys
+
 import numpy as np
 from pathlib import Path
 import matplotlib.pyplot as plt
 
-# import prophet (fallback to fbprophet if needed)
-try:
-    from prophet import Prophet
-except Exception:
-    from fbprophet import Prophet  # only if your env uses the older package name
+# shared backend modules live one folder up
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from data_access import DATA_PATH, SERIES_COLUMNS, get_title_series, load_monthly_aggregates, monthly_frame
+from prophet_backend import fit_prophet
 
 # paths
-DATA_PATH = Path("data/processed/monthly_aggregates.parquet")
 PLOT_DIR = Path("data/processed/plots")
 PLOT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -19,15 +19,14 @@ job_title = "Assistant Project Manager"
 
 # load data
 print(f"Loading data from: {DATA_PATH}")
-df = pd.read_parquet(DATA_PATH)
+df = load_monthly_aggregates(DATA_PATH, columns=SERIES_COLUMNS)
 
-# filter by title
-data = df[df["job_title"].str.lower() == job_title.lower()].copy()
-if data.empty:
+# monthly series for the title (one point per month, sorted)
+series = get_title_series(df, job_title)
+if series is None:
     raise ValueError(f"No records found for job title: {job_title}")
 
-# sort and keep needed columns
-data = data.sort_values("month").reset_index(drop=True)
+data = monthly_frame(series)
 
 # require enough points
 if data["month"].nunique() < 8:
@@ -45,14 +44,9 @@ split_idx = int(len(prophet_df) * 0.8)
 train = prophet_df.iloc[:split_idx].copy()
 test = prophet_df.iloc[split_idx:].copy()
 
-# build and fit model
-m = Prophet(
-    yearly_seasonality=False,  # enable if you have 2+ years of data
-    weekly_seasonality=False,
-    daily_seasonality=False,
-    changepoint_prior_scale=0.5
-)
-m.fit(train)
+# build and fit model (shared Stan backend; seasonality off, enable yearly with 2+ years of data)
+m, fit_seconds = fit_prophet(train, changepoint_prior_scale=0.5)
+print(f"Prophet fit in {fit_seconds:.3f}s")
 
 # in-sample forecast for test horizon
 future_test = m.make_future_dataframe(periods=len(test), freq="MS")
@@ -1,13 +1,50 @@
+import argparse
 import pandas as pd
 from pathlib import Path
 import json
 
 # paths
-SUMMARY_PATH = Path("data/processed/plots/model_comparison_summary.csv")
+COMPARE_PATH = Path("data/processed/plots/model_comparison_summary.csv")
+BACKTEST_PATH = Path("data/processed/plots/model_backtest_summary.csv")
 OUT_CSV = Path("data/processed/plots/model_winners.csv")
 OUT_JSON = Path("data/processed/plots/model_winners.json")
 
-# load summary from compare_many.py
+# candidates from compare_many.py, cheapest to fit first
+MODELS = [
+    ("Linear", "lin"),
+    ("Holt", "holt"),
+    ("ARIMA", "arima"),
+    ("Prophet", "prophet"),
+]
+
+# a cheaper model wins when its error is within this many percent of the best one,
+# so Prophet is only served where it is measurably more accurate
+TIE_TOLERANCE = 0.02
+
+
+def pick(candidates, idx):
+    # candidates in cost order; lowest metric at position idx, ties go to the cheaper model
+    valid = [c for c in candidates if pd.notna(c[idx])]
+    if not valid:
+        return None
+    best = min(c[idx] for c in valid)
+    return next(c for c in valid if c[idx] <= best * (1 + TIE_TOLERANCE))
+
+
+parser = argparse.ArgumentParser(description="Pick the best model per title from a comparison summary")
+parser.add_argument("--source", choices=["auto", "backtest", "compare"], default="auto",
+                    help="backtest = rolling-origin fold means (backtest.py), compare = single 80/20 split "
+                         "(compare_many.py), auto = backtest, or compare when there is no backtest summary")
+args = parser.parse_args()
+
+# both summaries use the same column layout
+SOURCES = {"backtest": BACKTEST_PATH, "compare": COMPARE_PATH}
+if args.source == "auto":
+    # the backtest is the better estimate; the single split is only a fallback
+    SUMMARY_PATH = BACKTEST_PATH if BACKTEST_PATH.exists() else COMPARE_PATH
+else:
+    SUMMARY_PATH = SOURCES[args.source]
+print("Scoring models from:", SUMMARY_PATH)
 df = pd.read_csv(SUMMARY_PATH)
 
 rows = []
@@ -15,35 +52,21 @@ rows = []
 for _, r in df.iterrows():
     job_title = r["job_title"]
 
-    # collect candidate models with their MAPE and RMSE
+    # collect candidate models with their MAPE and RMSE (older summaries may lack some)
     candidates = []
-
-    # linear
-    if pd.notna(r.get("lin_mape")):
-        candidates.append(("Linear", r["lin_mape"], r["lin_rmse"]))
-
-    # prophet
-    if pd.notna(r.get("prophet_mape")):
-        candidates.append(("Prophet", r["prophet_mape"], r["prophet_rmse"]))
+    for name, prefix in MODELS:
+        if pd.notna(r.get(f"{prefix}_mape")):
+            candidates.append((name, r[f"{prefix}_mape"], r.get(f"{prefix}_rmse")))
 
     # pick best model
     best_model = "N/A"
     best_mape = None
     best_rmse = None
 
-    # filter out rows with NaN MAPE
-    valid_by_mape = [c for c in candidates if pd.notna(c[1])]
-
-    if valid_by_mape:
-        # choose the one with lowest MAPE
-        best = min(valid_by_mape, key=lambda x: x[1])
+    # choose by MAPE; if all MAPE are NaN, fall back to RMSE (if available)
+    best = pick(candidates, 1) or pick(candidates, 2)
+    if best is not None:
         best_model, best_mape, best_rmse = best
-    else:
-        # if all MAPE are NaN, fall back to lowest RMSE (if available)
-        valid_by_rmse = [c for c in candidates if pd.notna(c[2])]
-        if valid_by_rmse:
-            best = min(valid_by_rmse, key=lambda x: x[2])
-            best_model, best_mape, best_rmse = best
 
     rows.append({
         "job_title": job_title,
@@ -66,5 +89,8 @@ with open(OUT_JSON, "w") as f:
     json.dump(rows, f, indent=2, default=float)
 print("Saved:", OUT_JSON)
 
+print("\nWinners by model:")
+print(winners["best_model"].value_counts().to_string())
+
 print("\nWinners preview:")
 print(winners.head(10).to_string(index=False))
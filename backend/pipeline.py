@@ -0,0 +1,269 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+# all stage scripts use paths relative to the repo root
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND = Path("backend")
+PROCESSED = Path("data/processed")
+STATE_PATH = PROCESSED / "pipeline_state.json"
+LOG_DIR = PROCESSED / "logs"
+
+PARQUET = PROCESSED / "monthly_aggregates.parquet"
+KPI_DIR = PROCESSED / "kpis"
+PLOT_DIR = PROCESSED / "plots"
+
+# stage -> script, upstream stages, input files (content-hashed) and expected outputs
+STAGES = {
+    "transform": {
+        "script": BACKEND / "etl/transform_data.py",
+        "deps": [],
+        "inputs": [Path("data/raw/job_data_final.xlsx")],
+        "outputs": [PARQUET, PARQUET.with_suffix(".arrow")],
+    },
+    "cube": {
+        "script": BACKEND / "etl/build_cube.py",
+        "deps": ["transform"],
+        "inputs": [PARQUET],
+        "outputs": [PROCESSED / "cube.npz"],
+    },
+    "kpis": {
+        "script": BACKEND / "etl/kpi_generate.py",
+        "deps": ["transform"],
+        "inputs": [PARQUET],
+        "outputs": [
+            KPI_DIR / "top_jobs_openings.csv",
+            KPI_DIR / "top_jobs_salary.csv",
+            KPI_DIR / "salary_growth_top10.csv",
+            KPI_DIR / "salary_spikes_top10.csv",
+            KPI_DIR / "salary_volatility_top10.csv",
+            KPI_DIR / "top_locations_salary.csv",
+        ],
+    },
+    "plots": {
+        "script": BACKEND / "etl/visualize_data.py",
+        "deps": ["transform", "cube"],
+        "inputs": [PARQUET, PROCESSED / "cube.npz"],
+        "outputs": [
+            PLOT_DIR / "top_job_titles.png",
+            PLOT_DIR / "top_locations.png",
+            PLOT_DIR / "top_salary_titles.png",
+            PLOT_DIR / "trends" / "manifest.json",
+        ],
+    },
+    # single 80/20 split per title: a quick comparison report that no other stage reads
+    # (winners are picked from the backtest), so it only runs when asked for with --only
+    "compare": {
+        "script": BACKEND / "models/compare_many.py",
+        "optional": True,
+        "deps": ["transform"],
+        "inputs": [PARQUET],
+        "outputs": [PLOT_DIR / "model_comparison_summary.csv"],
+    },
+    "backtest": {
+        "script": BACKEND / "models/backtest.py",
+        "deps": ["transform"],
+        "inputs": [PARQUET],
+        "outputs": [PLOT_DIR / "model_backtest_folds.csv", PLOT_DIR / "model_backtest_summary.csv"],
+    },
+    "winners": {
+        "script": BACKEND / "models/summarize_winners.py",
+        # pinned source, so the result doesn't depend on which summary happened to finish last
+        "args": ["--source", "backtest"],
+        "deps": ["backtest"],
+        "inputs": [PLOT_DIR / "model_backtest_summary.csv"],
+        "outputs": [PLOT_DIR / "model_winners.csv", PLOT_DIR / "model_winners.json"],
+    },
+    "forecasts": {
+        "script": BACKEND / "models/precompute_forecasts.py",
+        "deps": ["transform", "winners"],
+        "inputs": [PARQUET, PLOT_DIR / "model_winners.json"],
+        "outputs": [PROCESSED / "forecasts.parquet"],
+    },
+}
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(ROOT / path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def input_hashes(stage):
+    # the stage's own script counts as an input, so code changes rerun it too
+    paths = [stage["script"]] + stage["inputs"]
+    return {p.as_posix(): (sha256_file(p) if (ROOT / p).exists() else None) for p in paths}
+
+
+def load_state():
+    path = ROOT / STATE_PATH
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state):
+    path = ROOT / STATE_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def is_up_to_date(name, hashes, state):
+    prev = state.get(name)
+    if not prev or prev.get("status") != "ok":
+        return False
+    if prev.get("inputs") != hashes:
+        return False
+    return all((ROOT / p).exists() for p in STAGES[name]["outputs"])
+
+
+def run_script(name, script, extra_args):
+    # returns (exit code, wall seconds, peak RSS in MB or None)
+    log_path = ROOT / LOG_DIR / f"{name}.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.Popen(
+            [sys.executable, str(script), *extra_args],
+            cwd=ROOT, stdout=log, stderr=subprocess.STDOUT,
+        )
+
+        peak_mb = None
+        if hasattr(os, "wait4"):
+            # wait4 gives this child's own rusage (ru_maxrss is KB on Linux, bytes on macOS)
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+            peak_mb = round(usage.ru_maxrss / scale, 1)
+        else:
+            proc.wait()
+
+    return proc.returncode, time.perf_counter() - started, peak_mb
+
+
+def select_stages(only):
+    if not only:
+        return [s for s in STAGES if not STAGES[s].get("optional")]
+    unknown = [s for s in only if s not in STAGES]
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(unknown)}. Available: {', '.join(STAGES)}")
+    return [s for s in STAGES if s in only]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the ETL + model pipeline, skipping stages whose inputs are unchanged")
+    parser.add_argument("--only", nargs="+", metavar="STAGE",
+                        help=f"run just these stages ({', '.join(STAGES)}); compare only runs when listed here")
+    parser.add_argument("--force", action="store_true", help="run every selected stage even if inputs are unchanged")
+    parser.add_argument("--jobs", type=int, default=3, help="max stages running at the same time")
+    parser.add_argument("--dry-run", action="store_true", help="print what would run without running it")
+    args = parser.parse_args()
+
+    selected = select_stages(args.only)
+    state = load_state()
+
+    pending = set(selected)
+    finished = set(s for s in STAGES if s not in pending)
+    failed = set()
+    running = {}
+    summary = []
+
+    def ready(name):
+        return all(d in finished for d in STAGES[name]["deps"])
+
+    def blocked(name):
+        return any(d in failed for d in STAGES[name]["deps"])
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        while pending or running:
+            # start every stage whose upstream stages are done (independent ones run concurrently);
+            # skipped stages unblock their dependents immediately, so rescan until nothing changes
+            progressed = True
+            while progressed:
+                progressed = False
+                for name in [s for s in STAGES if s in pending and ready(s)]:
+                    progressed = True
+                    pending.discard(name)
+                    stage = STAGES[name]
+                    hashes = input_hashes(stage)
+
+                    if not args.force and is_up_to_date(name, hashes, state):
+                        print(f"[skip] {name}: inputs unchanged")
+                        summary.append((name, "skipped", None, None))
+                        finished.add(name)
+                        continue
+
+                    if args.dry_run:
+                        print(f"[would run] {name}: {stage['script'].as_posix()}")
+                        summary.append((name, "dry-run", None, None))
+                        finished.add(name)
+                        continue
+
+                    print(f"[run] {name}: {stage['script'].as_posix()}")
+                    fut = pool.submit(run_script, name, stage["script"], stage.get("args", []))
+                    running[fut] = (name, hashes)
+
+                for name in [s for s in STAGES if s in pending and blocked(s)]:
+                    progressed = True
+                    pending.discard(name)
+                    failed.add(name)
+                    print(f"[blocked] {name}: upstream stage failed")
+                    summary.append((name, "blocked", None, None))
+
+            if not running:
+                if pending:
+                    # nothing running and nothing ready means the selection is missing a dependency
+                    raise SystemExit(f"Cannot schedule: {', '.join(sorted(pending))}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name, hashes = running.pop(fut)
+                code, seconds, peak_mb = fut.result()
+                ok = code == 0
+
+                # input hashes are taken at launch, so edits made mid-run trigger a rerun next time
+                state[name] = {
+                    "status": "ok" if ok else "failed",
+                    "inputs": hashes,
+                    "wall_s": round(seconds, 2),
+                    "peak_rss_mb": peak_mb,
+                    "finished_at": datetime.now().isoformat(timespec="seconds"),
+                }
+                save_state(state)
+
+                mem = f", peak {peak_mb} MB" if peak_mb is not None else ""
+                if ok:
+                    finished.add(name)
+                    print(f"[done] {name}: {seconds:.2f}s{mem}")
+                else:
+                    failed.add(name)
+                    print(f"[fail] {name}: exit {code} after {seconds:.2f}s (see {(LOG_DIR / f'{name}.log').as_posix()})")
+                summary.append((name, "ok" if ok else "failed", seconds, peak_mb))
+
+    print("\nStage summary:")
+    for name, status, seconds, peak_mb in summary:
+        wall = f"{seconds:8.2f}s" if seconds is not None else " " * 9
+        mem = f"{peak_mb:8.1f} MB" if peak_mb is not None else ""
+        print(f"  {name:<10} {status:<8} {wall} {mem}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import threading
+import time
+
+import numpy as np
+
+# prophet is optional
+try:
+    from prophet import Prophet
+except Exception:
+    try:
+        from fbprophet import Prophet
+    except Exception:
+        Prophet = None
+
+# warm starts need the cmdstanpy backend (prophet >= 1.0)
+try:
+    from prophet.models import CmdStanPyBackend
+except Exception:
+    CmdStanPyBackend = None
+
+# the settings every model in this repo uses
+BASE_KWARGS = {
+    "yearly_seasonality": False,
+    "weekly_seasonality": False,
+    "daily_seasonality": False,
+}
+
+# one backend (compiled Stan model handle) per thread; backends keep per-fit state
+_local = threading.local()
+
+_stats_lock = threading.Lock()
+_stats = {"fits": 0, "warm_starts": 0, "seconds": 0.0}
+
+
+def _seconds(delta):
+    return np.asarray(delta, dtype="timedelta64[ns]").astype(np.int64) / 1e9
+
+
+def warm_params_of(model):
+    # a fitted model's trend in physical units (salary, seconds, dates), so it can seed
+    # a fit whose time span, y scaling or changepoint grid differ
+    y_scale = float(model.y_scale)
+    rate_scale = y_scale / model.t_scale.total_seconds()
+    return {
+        "start": np.datetime64(model.start, "ns"),
+        "k": float(np.ravel(model.params["k"])[0]) * rate_scale,
+        "m": float(np.ravel(model.params["m"])[0]) * y_scale + float(getattr(model, "y_min", 0.0) or 0.0),
+        "changepoints": np.asarray(model.changepoints, dtype="datetime64[ns]"),
+        "delta": np.ravel(model.params["delta"]) * rate_scale,
+        "sigma_obs": float(np.ravel(model.params["sigma_obs"])[0]) * y_scale,
+        "beta": np.ravel(model.params["beta"]),
+    }
+
+
+def _warm_init(model, warm, stan_init):
+    # re-express a previous trend on this fit's scales and changepoints (delta gets one
+    # entry per new changepoint, however many the old fit had)
+    y_scale = float(model.y_scale)
+    y_min = float(getattr(model, "y_min", 0.0) or 0.0)
+    rate_scale = y_scale / model.t_scale.total_seconds()
+
+    def rate_at(t):
+        return warm["k"] + warm["delta"][warm["changepoints"] <= t].sum()
+
+    def value_at(t):
+        after = np.maximum(_seconds(t - warm["changepoints"]), 0.0)
+        return warm["m"] + warm["k"] * _seconds(t - warm["start"]) + (warm["delta"] * after).sum()
+
+    start = np.datetime64(model.start, "ns")
+    out = dict(stan_init)
+    out["k"] = rate_at(start) / rate_scale
+    out["m"] = (value_at(start) - y_min) / y_scale
+    out["sigma_obs"] = max(warm["sigma_obs"] / y_scale, 1e-6)
+
+    new_cps = np.asarray(model.changepoints, dtype="datetime64[ns]")
+    if len(new_cps) == len(np.ravel(stan_init["delta"])):
+        rates = np.array([rate_at(start)] + [rate_at(c) for c in new_cps])
+        out["delta"] = np.diff(rates) / rate_scale
+
+    if len(warm["beta"]) == len(np.ravel(stan_init["beta"])):
+        out["beta"] = warm["beta"]
+    return out
+
+
+if CmdStanPyBackend is not None:
+    class WarmStartBackend(CmdStanPyBackend):
+        # CmdStanPy backend whose next fit can start from a previous fit's parameters
+
+        def __init__(self):
+            super().__init__()
+            # set by FastProphet.fit for the duration of one fit: stan_init -> warm stan_init
+            self.warm_init = None
+
+        def fit(self, stan_init, stan_data, **kwargs):
+            if self.warm_init is not None and "init" not in kwargs and "inits" not in kwargs:
+                stan_init = self.warm_init(stan_init)
+            return super().fit(stan_init, stan_data, **kwargs)
+else:
+    WarmStartBackend = None
+
+
+def _shared_backend():
+    backend = getattr(_local, "backend", None)
+    if backend is None:
+        backend = WarmStartBackend()
+        _local.backend = backend
+    return backend
+
+
+if Prophet is not None:
+    class FastProphet(Prophet):
+        # Prophet that reuses this thread's loaded Stan model instead of building a new backend
+
+        warm_params = None
+
+        def _load_stan_backend(self, stan_backend):
+            if WarmStartBackend is None or stan_backend not in (None, "CMDSTANPY"):
+                return super()._load_stan_backend(stan_backend)
+            self.stan_backend = _shared_backend()
+
+        def fit(self, df, **kwargs):
+            # scales and changepoints are only known inside fit, so the conversion runs there
+            warm = self.warm_params is not None and isinstance(self.stan_backend, WarmStartBackend)
+            if warm:
+                self.stan_backend.warm_init = lambda init: _warm_init(self, self.warm_params, init)
+            try:
+                return super().fit(df, **kwargs)
+            finally:
+                if warm:
+                    self.stan_backend.warm_init = None
+else:
+    FastProphet = None
+
+
+def make_prophet(uncertainty=True, **kwargs):
+    # uncertainty=False skips the posterior simulation in predict() when only yhat is used
+    if FastProphet is None:
+        raise RuntimeError("Prophet is not installed")
+    opts = dict(BASE_KWARGS, **kwargs)
+    if not uncertainty:
+        opts["uncertainty_samples"] = 0
+    return FastProphet(**opts)
+
+
+def fit_prophet(df, uncertainty=True, warm_params=None, **kwargs):
+    # fit on a (ds, y) frame; returns (fitted model, seconds)
+    m = make_prophet(uncertainty=uncertainty, **kwargs)
+    m.warm_params = warm_params
+    warm = (warm_params is not None and WarmStartBackend is not None
+            and isinstance(m.stan_backend, WarmStartBackend))
+
+    t0 = time.perf_counter()
+    m.fit(df)
+    seconds = time.perf_counter() - t0
+
+    with _stats_lock:
+        _stats["fits"] += 1
+        _stats["warm_starts"] += int(warm)
+        _stats["seconds"] += seconds
+    m.fit_seconds = seconds
+    return m, seconds
+
+
+def fit_stats():
+    with _stats_lock:
+        out = dict(_stats)
+    out["mean_seconds"] = out["seconds"] / out["fits"] if out["fits"] else None
+    return out
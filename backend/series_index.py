@@ -0,0 +1,79 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+from columnar import ColumnarStore
+from data_access import load_monthly_aggregates, partition_by_title, title_key
+
+
+class SeriesIndex:
+    # title.lower() -> TitleSeries plus a compact columnar copy of the aggregates,
+    # rebuilt when the parquet file changes on disk
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        # (mtime, store, series, derived) swapped as one reference so readers never see a half-built index
+        self._state = (None, None, {}, {})
+        # mtime of a file that failed to load, not retried until the file changes again
+        self._failed_mtime = None
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def refresh(self):
+        mtime = self._current_mtime()
+        if mtime is not None and mtime == self._state[0]:
+            return self._state
+
+        if self._state[1] is not None and (mtime is None or mtime == self._failed_mtime):
+            # file is being rewritten by the ETL (or is unreadable), keep serving the old index
+            return self._state
+
+        with self._lock:
+            # another thread may have rebuilt (or failed to) while we waited
+            mtime = self._current_mtime()
+            if (mtime is not None and mtime == self._state[0]) or (
+                self._state[1] is not None and (mtime is None or mtime == self._failed_mtime)
+            ):
+                return self._state
+
+            try:
+                df = load_monthly_aggregates(self.path)
+                # only the integer-coded columns stay resident, the DataFrame is dropped here
+                state = (mtime, ColumnarStore.from_frame(df), partition_by_title(df), {})
+            except Exception as e:
+                if self._state[1] is None:
+                    raise
+                # partial or corrupt file: keep the last good index until the file changes
+                self._failed_mtime = mtime
+                print(f"[series_index] reload of {self.path} failed, serving previous data: {e}", file=sys.stderr)
+                return self._state
+
+            self._failed_mtime = None
+            self._state = state
+            return self._state
+
+    def store(self):
+        return self.refresh()[1]
+
+    def version(self):
+        # changes whenever the index is rebuilt, handy as part of a cache key
+        return self.refresh()[0]
+
+    def derived(self, name, build):
+        # lazily build (once per data version) a structure computed from the columnar store
+        state = self.refresh()
+        cache = state[3]
+        if name not in cache:
+            with self._lock:
+                if name not in cache:
+                    cache[name] = build(state[1])
+        return cache[name]
+
+    def get(self, title):
+        return self.refresh()[2].get(title_key(title))
@@ -0,0 +1,153 @@
+import argparse
+import gc
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+
+# production entry point, run from the repo root:
+#   python backend/serve.py --workers 4 --threads 4
+#
+# the app (parquet, winners, KPIs, forecast artifact) is imported once in the master
+# and shared copy-on-write with forked workers. When processed data changes, the master
+# reloads it and re-forks the workers gracefully (gunicorn HUP).
+
+import app as api
+import metrics
+from kpi_store import KPI_FILES
+
+
+def watched_paths():
+    return [api.DATA_PATH, api.WINNERS_PATH, api.FORECASTS_PATH] + [api.KPI_DIR / f for f in KPI_FILES.values()]
+
+
+def snapshot():
+    out = {}
+    for p in watched_paths():
+        try:
+            out[p] = os.stat(p).st_mtime_ns
+        except FileNotFoundError:
+            out[p] = None
+    return out
+
+
+def freeze():
+    # move everything loaded so far out of the GC's reach, so collections in the
+    # workers don't touch (and copy) the shared pages
+    gc.collect()
+    gc.freeze()
+
+
+def watch(interval, on_change):
+    # poll mtimes; fire once a change has been stable for one interval (ETL finished writing)
+    last = snapshot()
+    pending = None
+    while True:
+        time.sleep(interval)
+        current = snapshot()
+        if current != last:
+            last, pending = current, current
+            continue
+        if pending is not None:
+            pending = None
+            try:
+                on_change()
+            except Exception as e:
+                print(f"[serve] data reload failed: {e}", file=sys.stderr)
+
+
+def start_watcher(interval, on_change):
+    if interval <= 0:
+        return
+    t = threading.Thread(target=watch, args=(interval, on_change), name="data-watcher", daemon=True)
+    t.start()
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class ApiApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return api.app
+
+    def when_ready(server):
+        def reload():
+            server.log.info("Processed data changed, reloading in master")
+            api.reload_data()
+            freeze()
+            # HUP: start new workers (forked from the refreshed master), retire old ones gracefully
+            os.kill(server.pid, signal.SIGHUP)
+
+        start_watcher(args.reload_interval, reload)
+
+    # workers write their metrics here so /metrics on any worker reports the whole server
+    metrics.registry.use_directory(os.environ.get("METRICS_DIR") or tempfile.mkdtemp(prefix="jma-metrics-"))
+
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread" if args.threads > 1 else "sync",
+        "timeout": args.timeout,
+        "graceful_timeout": args.timeout,
+        "preload_app": True,
+        "when_ready": when_ready,
+        "accesslog": "-" if args.access_log else None,
+    }
+    ApiApplication(options).run()
+
+
+def run_fallback(args):
+    # platforms without fork (Windows): one process, threads only, data reloaded in place
+    print("[serve] gunicorn unavailable, serving with a single multi-threaded process")
+    start_watcher(args.reload_interval, api.reload_data)
+    try:
+        from waitress import serve
+    except ImportError:
+        from werkzeug.serving import run_simple
+        run_simple(args.host, args.port, api.app, threaded=True)
+        return
+    serve(api.app, host=args.host, port=args.port, threads=args.threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Job Market Analysis API with preloaded data")
+    parser.add_argument("--host", default=os.environ.get("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5000)))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+                        help="worker processes (default: WEB_CONCURRENCY or all cores)")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("WEB_THREADS", 4)),
+                        help="request threads per worker")
+    parser.add_argument("--timeout", type=int, default=60, help="worker timeout / graceful shutdown seconds")
+    parser.add_argument("--reload-interval", type=float, default=5.0,
+                        help="seconds between processed-data checks, 0 disables reloading")
+    parser.add_argument("--access-log", action="store_true", help="log every request to stdout")
+    args = parser.parse_args()
+
+    # warm the derived indexes before forking so workers share them too
+    api.reload_data()
+    freeze()
+
+    if sys.platform == "win32" or not hasattr(os, "fork"):
+        run_fallback(args)
+    else:
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            run_fallback(args)
+            return
+        run_gunicorn(args)
+
+
+if __name__ == "__main__":
+    main()
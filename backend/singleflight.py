@@ -0,0 +1,58 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # concurrent calls with the same (group, key) share one execution of fn;
+    # every waiter gets the leader's result (or its exception)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {}
+
+    def do(self, group, key, fn):
+        flight_key = (group, key)
+        with self._lock:
+            stats = self._stats.setdefault(group, {"calls": 0, "executions": 0, "coalesced": 0})
+            stats["calls"] += 1
+            call = self._calls.get(flight_key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[flight_key] = call
+                stats["executions"] += 1
+            else:
+                stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # later callers start a fresh flight (results are cached elsewhere)
+            with self._lock:
+                self._calls.pop(flight_key, None)
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            return {group: dict(s) for group, s in self._stats.items()}
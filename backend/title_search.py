@@ -0,0 +1,99 @@
+from bisect import bisect_left
+
+import numpy as np
+
+# match kinds, best first
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING = range(4)
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TitleSearchIndex:
+    # case-folded prefix + trigram index over the forecastable titles, built once per data version
+
+    def __init__(self, titles, months, postings):
+        self.titles = titles                      # original spellings, sorted
+        self.keys = [t.lower() for t in titles]
+        self.months = months
+        self.postings = postings
+
+        # sorted (key, id) for whole-title prefixes and (word, id) for prefixes of later words
+        self._by_key = sorted((k, i) for i, k in enumerate(self.keys))
+        self._by_word = sorted(
+            (word, i) for i, k in enumerate(self.keys) for word in set(k.split()[1:])
+        )
+
+        # trigram -> sorted entry ids, for substring matches anywhere in the title
+        grams = {}
+        for i, k in enumerate(self.keys):
+            for g in trigrams(k):
+                grams.setdefault(g, []).append(i)
+        self._grams = {g: np.array(ids, dtype=np.int32) for g, ids in grams.items()}
+
+    @classmethod
+    def from_store(cls, store, min_months=8):
+        # same title set as /api/titles, with months of history and total postings per spelling
+        months = store.months_per_title()
+        postings = np.bincount(store.title_codes, weights=store.job_count, minlength=len(store.titles))
+        codes = np.flatnonzero(months >= min_months)
+        return cls(
+            titles=[str(store.titles[c]) for c in codes],
+            months=months[codes].astype(int).tolist(),
+            postings=postings[codes].astype(int).tolist(),
+        )
+
+    def __len__(self):
+        return len(self.titles)
+
+    @staticmethod
+    def _prefix_ids(pairs, prefix):
+        # ids whose key starts with `prefix`, by binary search on the sorted pairs
+        start = bisect_left(pairs, (prefix,))
+        ids = []
+        for key, i in pairs[start:]:
+            if not key.startswith(prefix):
+                break
+            ids.append(i)
+        return ids
+
+    def _substring_ids(self, q):
+        if len(q) < 3:
+            # too short for trigrams, a linear scan over the keys is cheap enough
+            return [i for i, k in enumerate(self.keys) if q in k]
+
+        candidates = None
+        for g in trigrams(q):
+            ids = self._grams.get(g)
+            if ids is None:
+                return []
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+        # trigrams only narrow it down, confirm the actual substring
+        return [i for i in candidates.tolist() if q in self.keys[i]]
+
+    def search(self, q):
+        # list of (kind, id) ranked by match kind, then most postings, then title
+        q = " ".join(str(q or "").lower().split())
+        if not q:
+            return [(PREFIX, i) for i in range(len(self.titles))]
+
+        kind = {}
+        for i in self._substring_ids(q):
+            kind[i] = SUBSTRING
+        for i in self._prefix_ids(self._by_word, q):
+            kind[i] = WORD_PREFIX
+        for i in self._prefix_ids(self._by_key, q):
+            kind[i] = EXACT if self.keys[i] == q else PREFIX
+
+        return sorted(((k, i) for i, k in kind.items()),
+                      key=lambda m: (m[0], -self.postings[m[1]], self.titles[m[1]]))
+
+    def page(self, q, page=1, page_size=20):
+        matches = self.search(q)
+        start = (page - 1) * page_size
+        results = [
+            {"job_title": self.titles[i], "months": self.months[i], "total_postings": self.postings[i]}
+            for _, i in matches[start:start + page_size]
+        ]
+        return len(matches), results
@@ -0,0 +1,110 @@
+import numpy as np
+
+# closed-form least squares for y = intercept + slope * t with t = 0, 1, 2, ...
+# same answer as sklearn LinearRegression on a single time-index feature,
+# but for every title at once on a NaN-padded (titles x months) array
+
+# sklearn's mean_absolute_percentage_error clips |y| at machine epsilon
+_EPS = np.finfo(np.float64).eps
+
+
+def pad_series(values_list):
+    # ragged list of 1-D arrays -> (padded 2-D float array, lengths)
+    lengths = np.array([len(v) for v in values_list], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    Y = np.full((len(values_list), width), np.nan)
+    for i, v in enumerate(values_list):
+        Y[i, :len(v)] = v
+    return Y, lengths
+
+
+def _fit_prefix(Y, n):
+    # fit each row on its first n[i] points, returns (slope, intercept)
+    cols = np.arange(Y.shape[1])
+    mask = cols[None, :] < n[:, None]
+    Yz = np.where(mask, Y, 0.0)
+
+    n_f = n.astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        y_mean = Yz.sum(axis=1) / n_f
+        t_mean = (n_f - 1.0) / 2.0
+        # sum((t - t_mean)^2) for t = 0..n-1
+        sxx = n_f * (n_f * n_f - 1.0) / 12.0
+        sxy = ((cols[None, :] - t_mean[:, None]) * Yz * mask).sum(axis=1)
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+    intercept = y_mean - slope * t_mean
+    return slope, intercept
+
+
+def fit_trends(values_list, train_frac=0.8):
+    # fit on the first int(n * train_frac) points of every series and score on the rest
+    Y, lengths = pad_series(values_list)
+    # same int(len * 0.8) split the model scripts use
+    split = np.array([int(n * train_frac) for n in lengths], dtype=np.int64)
+
+    slope, intercept = _fit_prefix(Y, split)
+
+    cols = np.arange(Y.shape[1])
+    test = (cols[None, :] >= split[:, None]) & (cols[None, :] < lengths[:, None])
+    pred = intercept[:, None] + slope[:, None] * cols[None, :]
+
+    n_test = test.sum(axis=1).astype(float)
+    err = np.where(test, Y - pred, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rmse = np.sqrt((err * err).sum(axis=1) / n_test)
+        ape = np.where(test, np.abs(err) / np.maximum(np.abs(np.where(test, Y, 1.0)), _EPS), 0.0)
+        mape = ape.sum(axis=1) / n_test * 100
+
+    return {
+        "slope": slope,
+        "intercept": intercept,
+        "split": split,
+        "rmse": rmse,
+        "mape": mape,
+    }
+
+
+def fit_line(values):
+    # single-series helper: (slope, intercept) over the whole series
+    Y, lengths = pad_series([np.asarray(values, dtype=float)])
+    slope, intercept = _fit_prefix(Y, lengths)
+    return float(slope[0]), float(intercept[0])
+
+
+def forecast_trends(values_list, horizon):
+    # fit every full series and extend it `horizon` steps, returns (titles x horizon)
+    Y, lengths = pad_series(values_list)
+    slope, intercept = _fit_prefix(Y, lengths)
+    steps = lengths[:, None] + np.arange(horizon)[None, :]
+    return intercept[:, None] + slope[:, None] * steps
+
+
+def backtest_trends(values_list, origins_list, horizon):
+    # rolling-origin Linear: series i is refitted on its first o points for every origin o
+    # in origins_list[i] and extended `horizon` steps. Running sums turn each refit into an
+    # O(1) update, so every fold of every series costs one cumulative pass.
+    # Returns one (folds x horizon) prediction array per series.
+    Y, lengths = pad_series([np.asarray(v, dtype=float) for v in values_list])
+    cols = np.arange(Y.shape[1])
+    Yz = np.where(cols[None, :] < lengths[:, None], Y, 0.0)
+
+    # S[:, n] = sum of the first n points
+    zeros = np.zeros((len(Y), 1))
+    sum_y = np.hstack([zeros, np.cumsum(Yz, axis=1)])
+    sum_ty = np.hstack([zeros, np.cumsum(cols[None, :] * Yz, axis=1)])
+
+    counts = [len(o) for o in origins_list]
+    rows = np.repeat(np.arange(len(origins_list)), counts)
+    n = np.array([o for origins in origins_list for o in origins], dtype=np.int64)
+
+    n_f = n.astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_mean = (n_f - 1.0) / 2.0
+        sxx = n_f * (n_f * n_f - 1.0) / 12.0
+        sxy = sum_ty[rows, n] - t_mean * sum_y[rows, n]
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        intercept = sum_y[rows, n] / n_f - slope * t_mean
+
+    steps = n[:, None] + np.arange(horizon)[None, :]
+    preds = intercept[:, None] + slope[:, None] * steps
+    return np.split(preds, np.cumsum(counts)[:-1])
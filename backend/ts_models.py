@@ -0,0 +1,77 @@
+import warnings
+
+import numpy as np
+
+# statsmodels is optional: without it Holt / ARIMA are simply not candidates
+try:
+    from statsmodels.tsa.arima.model import ARIMA
+    from statsmodels.tsa.holtwinters import Holt
+except Exception:
+    ARIMA = None
+    Holt = None
+
+# short, unindexed monthly series trip statsmodels' convergence / specification warnings
+# on almost every fit; the metrics already tell us when a fit is poor
+warnings.filterwarnings("ignore", module=r"statsmodels\.")
+
+# cheap candidates next to Linear (trend.py), each fitted in milliseconds on a monthly series
+MODELS = ("Holt", "ARIMA")
+
+# ARIMA(1,1,0) with drift: one AR term on the month-to-month changes plus a constant trend
+ARIMA_ORDER = (1, 1, 0)
+# two-sided 80% band, the same width Prophet reports by default
+INTERVAL_ALPHA = 0.2
+
+
+def available():
+    return Holt is not None
+
+
+def fit(name, values):
+    # always a cold fit: seeding the optimizer from a neighbouring fit is barely faster and
+    # often stops in a worse local optimum (Holt's brute-force start grid matters here)
+    values = np.asarray(values, dtype=float)
+    if name == "Holt":
+        # Holt linear trend (level + additive trend)
+        return Holt(values, initialization_method="estimated").fit()
+    if name == "ARIMA":
+        return ARIMA(values, order=ARIMA_ORDER, trend="t").fit()
+    raise ValueError(f"Unknown model: {name}")
+
+
+def predict(name, result, horizon):
+    # returns (predictions, (lower, upper) or None); only ARIMA reports a band
+    if name == "ARIMA":
+        fc = result.get_forecast(horizon)
+        band = np.asarray(fc.conf_int(alpha=INTERVAL_ALPHA), dtype=float)
+        return np.asarray(fc.predicted_mean, dtype=float), (band[:, 0], band[:, 1])
+    return np.asarray(result.forecast(horizon), dtype=float), None
+
+
+def forecast(name, values, horizon):
+    return predict(name, fit(name, values), horizon)
+
+
+def errors(actual, pred):
+    # (rmse, mape) with the same epsilon clip as sklearn's mean_absolute_percentage_error
+    err = actual - pred
+    rmse = float(np.sqrt(np.mean(err * err)))
+    mape = float(np.mean(np.abs(err) / np.maximum(np.abs(actual), np.finfo(np.float64).eps)) * 100)
+    return rmse, mape
+
+
+def score(name, values, train_frac=0.8):
+    # fit on the first int(n * train_frac) points and score on the rest,
+    # returns (rmse, mape) or (None, None) when the fit fails
+    values = np.asarray(values, dtype=float)
+    split = int(len(values) * train_frac)
+    train, test = values[:split], values[split:]
+    if not available() or len(test) == 0:
+        return None, None
+    try:
+        pred, _ = forecast(name, train, len(test))
+    except Exception:
+        return None, None
+    if not np.all(np.isfinite(pred)):
+        return None, None
+    return errors(test, pred)
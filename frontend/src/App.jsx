@@ -14,6 +14,13 @@ import {
 } from "recharts";
 
 const API = "http://127.0.0.1:5000";
+const TITLE_PAGE_SIZE = 20;
+const SEARCH_DEBOUNCE_MS = 250;
+const JOB_POLL_MS = 1000;
+// give up on a background fit after this many polls (about two minutes)
+const JOB_POLL_MAX = 120;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
 
 function fmtMoney(v) {
   const n = Number(v);
@@ -52,6 +59,16 @@ const TOOLTIP_ITEM_STYLE = {
   color: "#E5E7EB",
 };
 
+// one page of ranked title matches from the backend
+async function fetchTitles(q, page) {
+  const r = await fetch(
+    `${API}/api/titles/search?q=${encodeURIComponent(q)}&page=${page}&page_size=${TITLE_PAGE_SIZE}`
+  );
+  const d = await r.json();
+  if (!r.ok) throw new Error(d.error || "Failed to search titles");
+  return d;
+}
+
 function StatCard({ label, value, sub }) {
   return (
     <div className="statCard">
@@ -82,7 +99,10 @@ export default function App() {
   const [page, setPage] = useState("kpis"); // default KPIs
 
   // Data
-  const [titles, setTitles] = useState([]);
+  const [titleQuery, setTitleQuery] = useState("");
+  const [titleResults, setTitleResults] = useState([]);
+  const [titleTotal, setTitleTotal] = useState(0);
+  const [titlePage, setTitlePage] = useState(1);
   const [selectedTitle, setSelectedTitle] = useState("");
   const [kpis, setKpis] = useState(null);
 
@@ -96,12 +116,6 @@ export default function App() {
   useEffect(() => {
     (async () => {
       try {
-        const tRes = await fetch(`${API}/api/titles`);
-        const tData = await tRes.json();
-        const list = tData.titles || [];
-        setTitles(list);
-        if (list.length) setSelectedTitle(list[0]);
-
         const kRes = await fetch(`${API}/api/kpis`);
         const kData = await kRes.json();
         setKpis(kData);
@@ -113,6 +127,46 @@ export default function App() {
     })();
   }, []);
 
+  // server-side title search (debounced), the full list is never downloaded
+  useEffect(() => {
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const d = await fetchTitles(titleQuery, 1);
+        if (cancelled) return;
+        const list = d.results || [];
+        setTitleResults(list);
+        setTitleTotal(d.total || 0);
+        setTitlePage(1);
+        setSelectedTitle((cur) => cur || (list.length ? list[0].job_title : ""));
+      } catch {
+        if (!cancelled) setError("Failed to search titles");
+      }
+    }, SEARCH_DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [titleQuery]);
+
+  const loadMoreTitles = async () => {
+    try {
+      const d = await fetchTitles(titleQuery, titlePage + 1);
+      setTitleResults((cur) => [...cur, ...(d.results || [])]);
+      setTitlePage(titlePage + 1);
+    } catch {
+      setError("Failed to search titles");
+    }
+  };
+
+  const titleOptions = useMemo(() => {
+    // keep the current selection visible even when it isn't in the latest results
+    const names = titleResults.map((t) => t.job_title);
+    return selectedTitle && !names.includes(selectedTitle)
+      ? [{ job_title: selectedTitle }, ...titleResults]
+      : titleResults;
+  }, [titleResults, selectedTitle]);
+
   const loadHistory = async () => {
     if (!selectedTitle) return;
     setError("");
@@ -132,13 +186,32 @@ export default function App() {
     if (!selectedTitle) return;
     setError("");
     try {
-      const r = await fetch(
+      let r = await fetch(
         `${API}/api/forecast?title=${encodeURIComponent(
           selectedTitle
         )}&horizon=${horizon}`
       );
-      const d = await r.json();
-      if (!r.ok) return setError(d.error || "Failed to load forecast");
+      let d = await r.json();
+
+      // slow models are fitted in the background: 202 + job id, poll until it finishes
+      if (r.status === 202) {
+        setForecastModel("fitting…");
+        const statusUrl = `${API}${d.status_url}`;
+        for (let polls = 0; r.status === 202; polls++) {
+          if (polls >= JOB_POLL_MAX) {
+            setForecastModel("");
+            return setError("Forecast is taking too long, please try again later");
+          }
+          await sleep(JOB_POLL_MS);
+          r = await fetch(statusUrl);
+          d = await r.json();
+        }
+      }
+
+      if (!r.ok) {
+        setForecastModel("");
+        return setError(d.error || "Failed to load forecast");
+      }
       setForecast(d.forecast || []);
       setForecastModel(d.model || "");
     } catch {
@@ -264,18 +337,34 @@ export default function App() {
           {/* Controls only on Predict page */}
           {page === "predict" ? (
             <div className="topbarRight">
+              <input
+                className="control"
+                type="search"
+                placeholder="Search job titles…"
+                value={titleQuery}
+                onChange={(e) => setTitleQuery(e.target.value)}
+              />
+
               <select
                 className="control"
                 value={selectedTitle}
                 onChange={(e) => setSelectedTitle(e.target.value)}
               >
-                {titles.map((t, i) => (
-                  <option key={i} value={t}>
-                    {t}
+                {titleOptions.map((t) => (
+                  <option key={t.job_title} value={t.job_title}>
+                    {t.months
+                      ? `${t.job_title} (${t.months} mo, ${fmtCompact(t.total_postings)} posts)`
+                      : t.job_title}
                   </option>
                 ))}
               </select>
 
+              {titleResults.length < titleTotal ? (
+                <button className="btn" onClick={loadMoreTitles}>
+                  More titles
+                </button>
+              ) : null}
+
               <select
                 className="control controlSmall"
                 value={horizon}